@@ -1,14 +1,111 @@
 import random
-from typing import List, Dict, Any
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
+# Las categorías viven junto a las tareas; category_master pide completar en todas
+from task_manager_IPH import CATEGORIES
+
+# Tabla de reglas: (logro, métrica, comparador, umbral). Las métricas son
+# campos de las estadísticas, "category:<nombre>" para las tareas de una
+# categoría, "categories_completed" para el número de categorías con tareas,
+# "hours:<desde>-<hasta>" para las completadas en esa franja horaria y
+# "weekdays:<desde>-<hasta>" en esos días de la semana (0 = lunes, sin incluir <hasta>)
+ACHIEVEMENT_RULES: List[Tuple[str, str, str, int]] = [
+    ("first_step", "total_tasks_completed", ">=", 1),
+    ("points_master", "total_points", ">=", 100),
+
+    ("study_expert", "category:Estudio", ">=", 10),
+    ("health_guru", "category:Salud", ">=", 20),
+    ("exercise_champion", "category:Ejercicio", ">=", 15),
+    ("work_master", "category:Trabajo", ">=", 25),
+    ("home_expert", "category:Hogar", ">=", 30),
+    ("project_wizard", "category:Proyectos", ">=", 20),
+
+    # La mejor racha también cuenta las rachas completadas con fecha pasada
+    ("streak_master", "best_streak", ">=", 7),
+    ("streak_warrior", "best_streak", ">=", 14),
+    ("streak_legend", "best_streak", ">=", 30),
+
+    ("task_centurion", "total_tasks_completed", ">=", 100),
+    ("task_master", "total_tasks_completed", ">=", 500),
+    ("task_legend", "total_tasks_completed", ">=", 1000),
+
+    ("priority_warrior", "high_priority_completed", ">=", 10),
+    ("priority_master", "high_priority_completed", ">=", 50),
+
+    ("category_master", "categories_completed", ">=", len(CATEGORIES)),
+    ("daily_champion", "peak_daily_completed", ">=", 5),
+    ("weekly_legend", "peak_weekly_completed", ">=", 25),
+
+    ("night_owl", "hours:22-24", ">=", 10),
+    ("early_bird", "hours:0-8", ">=", 10),
+    ("weekend_warrior", "weekdays:5-7", ">=", 20),
+]
+
+# Métricas por franja: prefijo -> contador de las estadísticas
+BAND_METRICS = {"hours": "completed_by_hour", "weekdays": "completed_by_weekday"}
+
+def metric_value(stats: Dict[str, Any], metric: str) -> int:
+    """Valor actual de una métrica de la tabla de reglas"""
+    if metric.startswith("category:"):
+        return stats.get("tasks_by_category", {}).get(metric[len("category:"):], 0)
+    if metric == "categories_completed":
+        by_category = stats.get("tasks_by_category", {})
+        return sum(1 for category in CATEGORIES if by_category.get(category, 0) > 0)
+    prefix, _, band = metric.partition(":")
+    if prefix in BAND_METRICS:
+        start, end = (int(bound) for bound in band.split("-"))
+        return sum(stats.get(BAND_METRICS[prefix], [])[start:end])
+    return stats.get(metric, 0)
+
+class ThresholdIndex:
+    """Umbrales ordenados de las reglas de una métrica con el mismo comparador"""
+
+    def __init__(self, comparator: str, rules: List[Tuple[int, str]]):
+        if comparator not in (">=", ">"):
+            raise ValueError(f"Comparador no soportado: {comparator}")
+        rules = sorted(rules)
+        self.thresholds = [threshold for threshold, _ in rules]
+        self.achievement_ids = [achievement_id for _, achievement_id in rules]
+        self._bisect = bisect_right if comparator == ">=" else bisect_left
+        self.reached = 0  # Reglas ya superadas (los logros no se pierden)
+
+    def position(self, value: int) -> int:
+        """Número de reglas cuyo umbral se alcanza con `value` (umbral <= value con ">=",
+        umbral < value con ">")"""
+        return self._bisect(self.thresholds, value)
+
+    def newly_crossed(self, value: int) -> List[str]:
+        """Logros cuyo umbral se supera ahora y no se había superado antes"""
+        position = self.position(value)
+        if position <= self.reached:
+            return []
+        crossed = self.achievement_ids[self.reached:position]
+        self.reached = position
+        return crossed
+
+def compile_rules(rules: List[Tuple[str, str, str, int]]) -> Dict[str, List[ThresholdIndex]]:
+    """Agrupa la tabla de reglas en índices de umbrales por métrica"""
+    grouped: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+    for achievement_id, metric, comparator, threshold in rules:
+        grouped.setdefault((metric, comparator), []).append((threshold, achievement_id))
+    indexes: Dict[str, List[ThresholdIndex]] = {}
+    for (metric, comparator), metric_rules in grouped.items():
+        indexes.setdefault(metric, []).append(ThresholdIndex(comparator, metric_rules))
+    return indexes
 
 class AchievementManager:
     def __init__(self):
         self.unlocked_achievements = set()  # Usar un set para evitar duplicados
+        self.unlocked_at: Dict[str, str] = {}  # Logro -> fecha y hora en que se desbloqueó
+        self.rule_indexes = compile_rules(ACHIEVEMENT_RULES)
+        # Último valor evaluado de cada métrica; se guarda con los datos para
+        # que al iniciar solo se evalúen las métricas que cambiaron desde entonces
+        self._last_values: Dict[str, int] = {}
         self.achievements = {
             # Logros básicos
-            "Primera paso": {"name": "Primer Paso 🌱", "description": "Completa tu primera tarea", "unlocked": False},
-            "Maestro de puntos": {"name": "Maestro de Puntos 🏆", "description": "Alcanza 100 puntos totales", "unlocked": False},
+            "first_step": {"name": "Primer Paso 🌱", "description": "Completa tu primera tarea", "unlocked": False},
+            "points_master": {"name": "Maestro de Puntos 🏆", "description": "Alcanza 100 puntos totales", "unlocked": False},
             
             # Logros de categorías
             "study_expert": {"name": "Experto en Estudios 📚", "description": "Completa 10 tareas de estudio", "unlocked": False},
@@ -114,56 +211,53 @@ class AchievementManager:
         }
 
     def check_achievements(self, stats: Dict[str, Any], task: Any = None) -> List[str]:
+        """Desbloquea los logros cuyo umbral se superó; solo mira las métricas que cambiaron"""
         new_achievements = []
-        potential_achievements = self._get_potential_achievements(stats, task)
-        
-        for achievement in potential_achievements:
-            if (achievement not in self.unlocked_achievements and 
-                self._check_achievement_condition(achievement, stats, task)):
-                new_achievements.append(achievement)
-                self.unlocked_achievements.add(achievement)
-        
+        for metric, indexes in self.rule_indexes.items():
+            value = metric_value(stats, metric)
+            if self._last_values.get(metric) == value:
+                continue
+            self._last_values[metric] = value
+            for index in indexes:
+                for achievement in index.newly_crossed(value):
+                    if achievement not in self.unlocked_achievements:
+                        new_achievements.append(achievement)
+                        self.unlock(achievement)
         return new_achievements
 
-    def _check_achievement_condition(self, achievement: str, stats: Dict[str, Any], task: Any) -> bool:
-        if achievement not in self.unlocked_achievements:
-            current_hour = datetime.now().hour
-            is_weekend = datetime.now().weekday() >= 5
-            
-            match achievement:
-                # Logros básicos
-                case "Primer tarea completada" if stats.get("total_tasks_completed", 0) >= 1:
-                    return True
-                case "diez_tareas" if stats.get("total_tasks_completed", 0) >= 10:
-                    return True
-                    
-                # Logros de categoría
-                case "study_expert" if stats.get("tasks_by_category", {}).get("Estudio", 0) >= 10:
-                    return True
-                case "health_guru" if stats.get("tasks_by_category", {}).get("Salud", 0) >= 20:
-                    return True
-                case "exercise_champion" if stats.get("tasks_by_category", {}).get("Ejercicio", 0) >= 15:
-                    return True
-                case "work_master" if stats.get("tasks_by_category", {}).get("Trabajo", 0) >= 25:
-                    return True
-                    
-                # Logros de racha
-                case "streak_master" if stats.get("current_streak", 0) >= 7:
-                    return True
-                case "streak_warrior" if stats.get("current_streak", 0) >= 14:
-                    return True
-                case "streak_legend" if stats.get("current_streak", 0) >= 30:
-                    return True
-                    
-                # Logros especiales
-                case "night_owl" if current_hour >= 22 and task:
-                    return True
-                case "early_bird" if current_hour < 8 and task:
-                    return True
-                case "weekend_warrior" if is_weekend and task:
-                    return True
-                    
-        return False
+    def unlock(self, achievement: str, unlocked_at: str = None) -> None:
+        self.unlocked_achievements.add(achievement)
+        self.unlocked_at[achievement] = unlocked_at or datetime.now().isoformat(timespec="seconds")
+        self.achievements[achievement]["unlocked"] = True
+
+    def load_state(self, unlocked: Dict[str, str], watermark: Dict[str, int]) -> None:
+        """Restaura los logros guardados y los valores de las métricas con que se evaluaron"""
+        for achievement, unlocked_at in unlocked.items():
+            if achievement in self.achievements:  # Ignorar ids que ya no existen
+                self.unlock(achievement, unlocked_at)
+        self._last_values = {}
+        for metric, indexes in self.rule_indexes.items():
+            if metric not in watermark:
+                continue
+            positions = [index.position(watermark[metric]) for index in indexes]
+            if all(achievement in self.unlocked_achievements
+                   for index, position in zip(indexes, positions)
+                   for achievement in index.achievement_ids[:position]):
+                for index, position in zip(indexes, positions):
+                    index.reached = position
+                self._last_values[metric] = watermark[metric]
+            # Si falta algún logro ya superado (regla nueva o datos importados) la
+            # métrica se vuelve a evaluar entera en el siguiente check_achievements
+
+    def export_state(self) -> Dict[str, Any]:
+        """Logros desbloqueados y marca de evaluación, tal como se guardan en los datos"""
+        return {
+            "achievements": dict(self.unlocked_at),
+            "achievement_watermark": dict(self._last_values)
+        }
+
+    def get_achievement_name(self, achievement: str) -> str:
+        return self.achievements.get(achievement, {}).get("name", achievement)
 
     def get_random_message(self, task=None, stats=None) -> str:
         current_hour = datetime.now().hour
@@ -184,46 +278,3 @@ class AchievementManager:
             return random.choice(self.motivational_messages["mastery"])
         
         return random.choice(self.motivational_messages["intrinsic"])
-
-    def _get_potential_achievements(self, stats: Dict[str, Any], task: Any = None) -> List[str]:
-        """
-        Returns a list of achievement IDs that should be checked based on current stats and task.
-        """
-        potential = []
-        
-        # Basic achievements
-        if stats.get("total_tasks_completed", 0) >= 1:
-            potential.append("Primera Tarea Completada")
-        if stats.get("total_tasks_completed", 0) >= 10:
-            potential.append("Aprendiendo, Maestro De puntos")
-        
-        # Category achievements
-        if stats.get("tasks_by_category", {}).get("Estudio", 0) >= 10:
-            potential.append("study_expert")
-        if stats.get("tasks_by_category", {}).get("Salud", 0) >= 20:
-            potential.append("health_guru")
-        if stats.get("tasks_by_category", {}).get("Ejercicio", 0) >= 15:
-            potential.append("exercise_champion")
-        if stats.get("tasks_by_category", {}).get("Trabajo", 0) >= 25:
-            potential.append("work_master")
-        
-        # Streak achievements
-        if stats.get("current_streak", 0) >= 7:
-            potential.append("streak_master")
-        if stats.get("current_streak", 0) >= 14:
-            potential.append("streak_warrior")
-        if stats.get("current_streak", 0) >= 30:
-            potential.append("streak_legend")
-        
-        # Special achievements (time-based)
-        current_hour = datetime.now().hour
-        is_weekend = datetime.now().weekday() >= 5
-        
-        if current_hour >= 22 and task:
-            potential.append("night_owl")
-        if current_hour < 8 and task:
-            potential.append("early_bird")
-        if is_weekend and task:
-            potential.append("weekend_warrior")
-        
-        return potential
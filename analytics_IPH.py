@@ -0,0 +1,166 @@
+from datetime import date, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+
+# numpy es opcional: sin él la aplicación funciona igual, solo sin el análisis
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WEEKDAY_NAMES = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+
+def is_available() -> bool:
+    return np is not None
+
+class StatsAnalytics:
+    """Análisis del historial de completadas con arrays de NumPy.
+
+    Cada completada es una posición en los arrays `days` (días desde
+    1970-01-01), `categories` (código de categoría), `priorities`, `points`,
+    `hours` y `weekdays` (hora y día de la semana en que se completó, 0 =
+    lunes; -1 si se desconoce). Todas las series
+    se calculan con operaciones vectorizadas, sin recorrer el historial en Python.
+    """
+
+    def __init__(self, events: Iterable):
+        if np is None:
+            raise RuntimeError("El análisis de estadísticas necesita numpy")
+        events = list(events)
+        count = len(events)
+        # datetime64 convierte las fechas ISO en C, sin date.fromisoformat por evento
+        self.days = np.array([event[0] for event in events], dtype="datetime64[D]").astype(np.int64)
+        self.category_names, self.categories = np.unique(
+            np.array([event[1] for event in events], dtype=str), return_inverse=True)
+        self.points = np.fromiter((event[2] for event in events), dtype=np.int64, count=count)
+        self.priorities = np.fromiter((event[3] for event in events), dtype=np.int8, count=count)
+        self.hours = np.fromiter((-1 if event[4] is None else event[4] for event in events),
+                                 dtype=np.int8, count=count)
+        self.weekdays = np.fromiter((-1 if event[5] is None else event[5] for event in events),
+                                    dtype=np.int8, count=count)
+        self.first_day = int(self.days.min()) if count else None
+        self.last_day = int(self.days.max()) if count else None
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @staticmethod
+    def _date(day: int) -> date:
+        return date(1970, 1, 1) + timedelta(days=int(day))
+
+    def daily_series(self, weights: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """Puntos (o `weights`) por día, desde el primer hasta el último día con completadas"""
+        if not len(self):
+            return np.zeros(0)
+        return np.bincount(self.days - self.first_day,
+                           weights=self.points if weights is None else weights,
+                           minlength=self.last_day - self.first_day + 1)
+
+    def daily_counts(self) -> "np.ndarray":
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+        return np.bincount(self.days - self.first_day, minlength=self.last_day - self.first_day + 1)
+
+    def weekly_series(self) -> Dict[str, Any]:
+        """Puntos por semana (lunes a domingo)"""
+        if not len(self):
+            return {"start": [], "points": np.zeros(0)}
+        # 1970-01-01 fue jueves
+        week_start = self.days - (self.days + 3) % 7
+        first_week = int(week_start.min())
+        points = np.bincount((week_start - first_week) // 7, weights=self.points)
+        starts = [self._date(first_week + 7 * i) for i in range(len(points))]
+        return {"start": starts, "points": points}
+
+    def monthly_series(self) -> Dict[str, Any]:
+        """Puntos por mes, incluidos los meses sin completadas"""
+        if not len(self):
+            return {"month": [], "points": np.zeros(0)}
+        months = self.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        first_month = int(months.min())
+        points = np.bincount(months - first_month, weights=self.points)
+        labels = [str(np.datetime64(first_month + i, "M")) for i in range(len(points))]
+        return {"month": labels, "points": points}
+
+    def category_totals(self) -> Dict[str, Dict[str, int]]:
+        """Completadas y puntos por categoría"""
+        counts = np.bincount(self.categories, minlength=len(self.category_names))
+        points = np.bincount(self.categories, weights=self.points, minlength=len(self.category_names))
+        return {name: {"completed": int(counts[i]), "points": int(points[i])}
+                for i, name in enumerate(self.category_names)}
+
+    def rolling_average(self, window: int = 7) -> "np.ndarray":
+        """Media móvil de puntos diarios (el primer valor cubre los primeros `window` días)"""
+        series = self.daily_series()
+        if len(series) < window:
+            return np.zeros(0)
+        cumulative = np.cumsum(np.concatenate(([0.0], series)))
+        return (cumulative[window:] - cumulative[:-window]) / window
+
+    def streaks(self, today: Optional[date] = None) -> Dict[str, int]:
+        """Mejor racha y racha actual (que termina hoy o ayer) de días con completadas"""
+        if not len(self):
+            return {"best": 0, "current": 0}
+        active = self.daily_counts() > 0
+        # Inicio y fin de cada tramo de días activos
+        edges = np.diff(np.concatenate(([0], active.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        lengths = ends - starts
+
+        today_index = (today or date.today()).toordinal() - date(1970, 1, 1).toordinal() - self.first_day
+        current = 0
+        for index in (today_index, today_index - 1):
+            if 0 <= index < len(active) and active[index]:
+                run = np.searchsorted(starts, index, side="right") - 1
+                current = int(index - starts[run] + 1)
+                break
+        return {"best": int(lengths.max()), "current": current}
+
+    def weekday_hour_heatmap(self) -> "np.ndarray":
+        """Matriz 7x24 de completadas por día de la semana y hora"""
+        matrix = np.zeros((7, 24), dtype=np.int64)
+        known = (self.hours >= 0) & (self.weekdays >= 0)
+        np.add.at(matrix, (self.weekdays[known], self.hours[known]), 1)
+        return matrix
+
+    def calendar_heatmap(self, weeks: int = 53, today: Optional[date] = None) -> "np.ndarray":
+        """Matriz 7 x `weeks` de puntos por día, como un calendario anual (la última columna es esta semana)"""
+        today = today or date.today()
+        end = today.toordinal() - date(1970, 1, 1).toordinal()
+        start = end - today.weekday() - 7 * (weeks - 1)
+        in_range = (self.days >= start) & (self.days <= end)
+        offsets = self.days[in_range] - start
+        matrix = np.zeros((7, weeks))
+        np.add.at(matrix, (offsets % 7, offsets // 7), self.points[in_range])
+        return matrix
+
+    def summary(self) -> List[str]:
+        """Resumen en texto para el panel de estadísticas"""
+        if not len(self):
+            return ["Todavía no hay tareas completadas"]
+        streaks = self.streaks()
+        lines = [
+            f"Completadas: {len(self)} desde {self._date(self.first_day).isoformat()}",
+            f"Puntos: {int(self.points.sum())}",
+            f"Mejor racha: {streaks['best']} días | Actual: {streaks['current']} días",
+        ]
+        rolling = self.rolling_average(7)
+        if len(rolling):
+            lines.append(f"Media móvil de 7 días: {rolling[-1]:.1f} puntos/día")
+
+        monthly = self.monthly_series()
+        lines.append("Últimos meses:")
+        peak = max(1.0, float(monthly["points"].max()))
+        for label, points in list(zip(monthly["month"], monthly["points"]))[-6:]:
+            lines.append(f"  {label} {'█' * int(round(12 * points / peak)):<12} {int(points)}")
+
+        lines.append("Por categoría:")
+        totals = sorted(self.category_totals().items(), key=lambda item: -item[1]["points"])
+        for name, total in totals:
+            lines.append(f"  {name}: {total['completed']} tareas, {total['points']} puntos")
+
+        heatmap = self.weekday_hour_heatmap()
+        if heatmap.any():
+            weekday, hour = np.unravel_index(int(heatmap.argmax()), heatmap.shape)
+            lines.append(f"Momento más productivo: {WEEKDAY_NAMES[weekday]} a las {hour}:00")
+        return lines
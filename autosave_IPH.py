@@ -0,0 +1,91 @@
+import threading
+from typing import Any, Callable, Optional
+
+class AutoSaver:
+    """Guardado automático con debounce y un único hilo escritor.
+
+    Las peticiones que llegan dentro de la ventana `delay_ms` se agrupan en un
+    solo guardado. El snapshot se captura en el hilo de Tk (donde viven las
+    tareas) y el hilo escritor lo serializa y lo escribe en disco; si llega
+    otro antes de que termine, solo se escribe el más reciente.
+    """
+
+    def __init__(self, root, capture: Callable[[], Any], write: Callable[[Any], None],
+                 delay_ms: int = 1500):
+        self.root = root
+        self.capture = capture
+        self.write = write
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._pending: Optional[Any] = None
+        self._writing = False
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._worker.start()
+
+    def request(self):
+        """Programa un guardado; las peticiones seguidas reinician la ventana"""
+        if self._stopped:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self._submit)
+
+    def flush(self):
+        """Guarda ya, sin esperar a que termine la ventana"""
+        if self._stopped:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._submit()
+
+    def busy(self) -> bool:
+        """Indica si hay un snapshot esperando al hilo escritor o escribiéndose"""
+        with self._condition:
+            return self._pending is not None or self._writing
+
+    def _submit(self):
+        self._after_id = None
+        self._enqueue(self.capture())
+
+    def _enqueue(self, snapshot: Any):
+        with self._condition:
+            # Un snapshot más nuevo sustituye al que aún no se ha escrito
+            self._pending = snapshot
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self.write(snapshot)
+            except Exception as e:
+                print(f"Error al guardar datos: {e}")
+            finally:
+                with self._condition:
+                    self._writing = False
+
+    def close(self, snapshot: Any = None, timeout: float = 5.0) -> bool:
+        """Escribe el último snapshot y espera como máximo `timeout` segundos.
+
+        Devuelve False si el hilo escritor no terminó a tiempo.
+        """
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+            if snapshot is None:
+                snapshot = self.capture()
+        if snapshot is not None:
+            self._enqueue(snapshot)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._worker.join(timeout)
+        return not self._worker.is_alive()
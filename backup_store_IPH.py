@@ -0,0 +1,238 @@
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from safe_io_IPH import CorruptFileError, atomic_write, read_json, write_json
+import codec_IPH
+
+# Cuántos backups conservar en cada nivel de retención
+DEFAULT_RETENTION = {
+    "recent": 10,   # los últimos N snapshots, sin importar su antigüedad
+    "hourly": 24,   # el más reciente de cada una de las últimas N horas
+    "daily": 14,    # el más reciente de cada uno de los últimos N días
+    "weekly": 8     # el más reciente de cada una de las últimas N semanas
+}
+
+RETENTION_BUCKETS = {
+    "hourly": lambda created: created.strftime("%Y%m%d%H"),
+    "daily": lambda created: created.strftime("%Y%m%d"),
+    "weekly": lambda created: "%d-%02d" % created.isocalendar()[:2]
+}
+
+class BackupStore:
+    """Almacén de backups direccionado por contenido.
+
+    Cada snapshot se identifica por el SHA-256 de su JSON canónico, así que
+    los snapshots idénticos se guardan una sola vez. Los sucesivos se
+    guardan comprimidos como deltas a nivel de tarea sobre el anterior, con
+    un snapshot completo cada `max_chain` deltas para acotar la restauración.
+    """
+
+    def __init__(self, root_dir: str, retention: Optional[Dict[str, int]] = None,
+                 max_chain: int = 10, json_default: Optional[Callable] = None):
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.index_file = os.path.join(root_dir, "index.json")
+        self.retention = dict(DEFAULT_RETENTION)
+        if retention:
+            self.retention.update(retention)
+        self.max_chain = max_chain
+        self.json_default = json_default
+        self._last: Optional[tuple] = None  # (hash, snapshot) del último backup
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # El índice se lee en el primer uso (normalmente en el hilo de guardado),
+        # no al crear el DataManager durante el arranque
+        self._index: Optional[Dict[str, Any]] = None
+
+    @property
+    def index(self) -> Dict[str, Any]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def exists(self) -> bool:
+        return os.path.exists(self.index_file)
+
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            return read_json(self.index_file)
+        except FileNotFoundError:
+            return {"entries": [], "objects": {}}
+        except CorruptFileError as e:
+            print(f"Error al cargar índice de backups: {e}")
+            return {"entries": [], "objects": {}}
+
+    def _save_index(self):
+        write_json(self.index_file, self.index)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.json.gz")
+
+    def _write_object(self, digest: str, obj: Dict[str, Any]):
+        # Indentado para que un backup descomprimido se pueda leer a mano
+        raw = codec_IPH.dumps(obj, pretty=True)
+        atomic_write(self._object_path(digest), gzip.compress(raw, compresslevel=6))
+
+    def _read_object(self, digest: str) -> Dict[str, Any]:
+        with open(self._object_path(digest), 'rb') as f:
+            return codec_IPH.loads(gzip.decompress(f.read()))
+
+    def add(self, data: Dict[str, Any], created: Optional[datetime] = None) -> str:
+        """Guarda un snapshot y devuelve el nombre del backup"""
+        created = created or datetime.now()
+        canonical, digest = self._digest(data)
+        entries = self.index["entries"]
+
+        # Mismo contenido que el último backup: no hay nada nuevo que guardar
+        if entries and entries[-1]["hash"] == digest:
+            return entries[-1]["name"]
+
+        snapshot = codec_IPH.loads(canonical)
+        if digest not in self.index["objects"]:
+            self._store_snapshot(digest, snapshot)
+
+        name = f"backup_{created.strftime('%Y%m%d_%H%M%S')}.json"
+        if entries and entries[-1]["name"] == name:
+            entries.pop()
+        entries.append({"name": name, "hash": digest, "created": created.isoformat()})
+        self._last = (digest, snapshot)
+
+        self._apply_retention()
+        self._save_index()
+        return name
+
+    def _digest(self, data: Dict[str, Any]) -> Tuple[str, str]:
+        """JSON canónico del snapshot y su SHA-256"""
+        # Siempre con json de la stdlib: el hash no debe depender del backend instalado
+        canonical = json.dumps(data, ensure_ascii=False, sort_keys=True,
+                               separators=(',', ':'), default=self.json_default)
+        return canonical, hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _store_snapshot(self, digest: str, snapshot: Dict[str, Any]):
+        """Escribe el snapshot como delta del anterior o completo si la cadena es larga"""
+        entries = self.index["entries"]
+        base_digest = entries[-1]["hash"] if entries else None
+        base_info = self.index["objects"].get(base_digest)
+
+        if base_info is not None and base_info["depth"] + 1 < self.max_chain:
+            base = self._last[1] if self._last and self._last[0] == base_digest \
+                else self._materialize(base_digest)
+            self._write_object(digest, self._make_delta(base_digest, base, snapshot))
+            self.index["objects"][digest] = {"base": base_digest, "depth": base_info["depth"] + 1}
+        else:
+            self._write_object(digest, {"type": "full", "data": snapshot})
+            self.index["objects"][digest] = {"base": None, "depth": 0}
+
+    def _make_delta(self, base_digest: str, base: Dict[str, Any], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        base_tasks = {task["id"]: task for task in base.get("tasks", [])}
+        new_ids = [task["id"] for task in snapshot.get("tasks", [])]
+        new_id_set = set(new_ids)
+
+        removed = [task_id for task_id in base_tasks if task_id not in new_id_set]
+        upserts = [task for task in snapshot.get("tasks", []) if base_tasks.get(task["id"]) != task]
+
+        delta = {
+            "type": "delta",
+            "base": base_digest,
+            "meta": {key: value for key, value in snapshot.items() if key != "tasks"},
+            "upserts": upserts,
+            "removed": removed
+        }
+        # Solo se guarda el orden si no es el del base con las nuevas al final
+        if new_ids != self._default_order(base_tasks, removed, upserts):
+            delta["order"] = new_ids
+        return delta
+
+    @staticmethod
+    def _default_order(base_tasks: Dict[str, Any], removed: List[str], upserts: List[Dict[str, Any]]) -> List[str]:
+        removed_set = set(removed)
+        order = [task_id for task_id in base_tasks if task_id not in removed_set]
+        order.extend(task["id"] for task in upserts if task["id"] not in base_tasks)
+        return order
+
+    def _materialize(self, digest: str) -> Dict[str, Any]:
+        """Reconstruye un snapshot siguiendo su cadena de deltas hasta el completo"""
+        chain = []
+        current = digest
+        while True:
+            obj = self._read_object(current)
+            if obj["type"] == "full":
+                data = obj["data"]
+                break
+            chain.append(obj)
+            current = obj["base"]
+
+        for delta in reversed(chain):
+            tasks = {task["id"]: task for task in data.get("tasks", [])}
+            order = delta.get("order") or self._default_order(tasks, delta["removed"], delta["upserts"])
+            for task_id in delta["removed"]:
+                tasks.pop(task_id, None)
+            for task in delta["upserts"]:
+                tasks[task["id"]] = task
+            data = dict(delta["meta"])
+            data["tasks"] = [tasks[task_id] for task_id in order]
+        return data
+
+    def restore(self, name: str) -> Optional[Dict[str, Any]]:
+        """Devuelve el snapshot guardado con ese nombre, o None si no existe"""
+        for entry in reversed(self.index["entries"]):
+            if entry["name"] == name:
+                if self._last and self._last[0] == entry["hash"]:
+                    return codec_IPH.loads(codec_IPH.dumps(self._last[1]))
+                return self._materialize(entry["hash"])
+        return None
+
+    def latest_valid(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(nombre, datos) del backup más reciente que se reconstruye con el hash esperado"""
+        for entry in reversed(self.index["entries"]):
+            try:
+                data = self._materialize(entry["hash"])
+            except (OSError, EOFError, ValueError, KeyError, zlib.error) as e:
+                print(f"Error al leer backup {entry['name']}: {e}")
+                continue
+            if self._digest(data)[1] == entry["hash"]:
+                return entry["name"], data
+            print(f"Error al leer backup {entry['name']}: el contenido no coincide con su hash")
+        return None
+
+    def list_names(self) -> List[str]:
+        return [entry["name"] for entry in self.index["entries"]]
+
+    def _apply_retention(self):
+        """Aplica la política de retención y borra los objetos que ya nadie usa"""
+        entries = self.index["entries"]
+        keep = {id(entry) for entry in entries[-self.retention.get("recent", 0):]} \
+            if self.retention.get("recent", 0) > 0 else set()
+
+        for tier, bucket_of in RETENTION_BUCKETS.items():
+            limit = self.retention.get(tier, 0)
+            seen = set()
+            for entry in reversed(entries):
+                if len(seen) >= limit:
+                    break
+                bucket = bucket_of(datetime.fromisoformat(entry["created"]))
+                if bucket not in seen:
+                    seen.add(bucket)
+                    keep.add(id(entry))
+
+        self.index["entries"] = [entry for entry in entries if id(entry) in keep]
+        self._collect_garbage()
+
+    def _collect_garbage(self):
+        objects = self.index["objects"]
+        reachable = set()
+        for entry in self.index["entries"]:
+            digest = entry["hash"]
+            while digest and digest not in reachable:
+                reachable.add(digest)
+                digest = objects.get(digest, {}).get("base")
+
+        for digest in [d for d in objects if d not in reachable]:
+            del objects[digest]
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
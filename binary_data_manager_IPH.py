@@ -0,0 +1,261 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+from data_manager_IPH import DataManager, UNDATED_MONTH, month_of
+from safe_io_IPH import CorruptFileError, atomic_write, fsync_dir
+import codec_IPH
+
+MAGIC = b"MOTIVDB\x00"
+VERSION = 2
+# magic, versión, nº de tareas, tamaño del pool de cadenas, tamaño del meta y CRC32 de la
+# cabecera, la tabla de CRC por bloque y el meta (en la versión 1, CRC32 de todo el cuerpo)
+HEADER = struct.Struct("<8sIIIII")
+# Por tarea: (offset, longitud) en el pool de id, title, description, category,
+# scheduled_date, created_at y completed_at; después priority y completed
+RECORD = struct.Struct("<14IBB2x")
+STRING_FIELDS = ("id", "title", "description", "category", "scheduled_date", "created_at", "completed_at")
+NONE_REF = 0xFFFFFFFF
+# La tabla de registros y el pool se dividen en bloques con su propio CRC32, que se
+# comprueba la primera vez que se decodifica algo del bloque y no al abrir el archivo
+RECORD_BLOCK = 1024
+POOL_BLOCK = 1 << 16
+
+def _block_crcs(data: bytes, block_size: int) -> List[int]:
+    with memoryview(data) as view:
+        return [zlib.crc32(view[start:start + block_size]) for start in range(0, len(data), block_size)]
+
+def encode_snapshot(tasks: List[Dict[str, Any]], meta: Dict[str, Any]) -> bytes:
+    """Tabla de registros de ancho fijo + pool de cadenas (sin repetir) + meta en JSON"""
+    pool = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+    table = bytearray()
+    for task in tasks:
+        refs = []
+        for field in STRING_FIELDS:
+            value = task.get(field)
+            if value is None:
+                refs += (NONE_REF, 0)
+                continue
+            ref = offsets.get(value)
+            if ref is None:
+                raw = value.encode('utf-8')
+                ref = offsets[value] = (len(pool), len(raw))
+                pool += raw
+            refs += ref
+        table += RECORD.pack(*refs, int(task.get("priority", 1)), 1 if task.get("completed") else 0)
+
+    table, pool = bytes(table), bytes(pool)
+    meta_raw = codec_IPH.dumps(meta)
+    crcs = _block_crcs(table, RECORD_BLOCK * RECORD.size) + _block_crcs(pool, POOL_BLOCK)
+    crc_table = struct.pack(f"<{len(crcs)}I", *crcs)
+    fields = (MAGIC, VERSION, len(tasks), len(pool), len(meta_raw))
+    crc = zlib.crc32(meta_raw, zlib.crc32(crc_table, zlib.crc32(HEADER.pack(*fields, 0)[:-4])))
+    return b"".join((HEADER.pack(*fields, crc), crc_table, table, pool, meta_raw))
+
+class BinarySnapshot:
+    """Snapshot binario abierto con mmap; las tareas se decodifican solo al pedirlas.
+
+    Al abrir solo se comprueban la cabecera, la tabla de CRC y el meta; cada
+    bloque de registros o del pool se comprueba al decodificarlo por primera vez.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise CorruptFileError(f"{path} está vacío")
+        try:
+            magic, version, self.count, pool_size, meta_size, crc = HEADER.unpack_from(self._buffer, 0)
+            if magic != MAGIC or version not in (1, VERSION):
+                raise CorruptFileError(f"{path} no es un snapshot válido")
+            # Bloques de registros y del pool (la versión 1 no los tiene)
+            record_blocks = -(-self.count // RECORD_BLOCK) if version == VERSION else 0
+            pool_blocks = -(-pool_size // POOL_BLOCK) if version == VERSION else 0
+            self._table_at = HEADER.size + 4 * (record_blocks + pool_blocks)
+            self._pool_at = self._table_at + self.count * RECORD.size
+            self._pool_size = pool_size
+            meta_at = self._pool_at + pool_size
+            if len(self._buffer) != meta_at + meta_size:
+                raise CorruptFileError(f"{path} no es un snapshot válido")
+            with memoryview(self._buffer) as view:
+                if version == VERSION:
+                    expected = zlib.crc32(view[meta_at:], zlib.crc32(
+                        view[HEADER.size:self._table_at], zlib.crc32(view[:HEADER.size - 4])))
+                else:
+                    # Formato anterior: un solo CRC del cuerpo, comprobado entero al abrir
+                    expected = zlib.crc32(view[HEADER.size:])
+            if expected != crc:
+                raise CorruptFileError(f"checksum incorrecto en {path}")
+            crcs = struct.unpack_from(f"<{record_blocks + pool_blocks}I", self._buffer, HEADER.size)
+            self._record_crcs, self._pool_crcs = crcs[:record_blocks], crcs[record_blocks:]
+            # Bloques comprobados (1) o pendientes (0), y cuántos quedan pendientes
+            self._checked_records = bytearray(record_blocks)
+            self._checked_pool = bytearray(pool_blocks)
+            self._unchecked = record_blocks + pool_blocks
+            self.meta = codec_IPH.loads(self._buffer[meta_at:])
+        except (struct.error, ValueError) as e:
+            self.close()
+            if isinstance(e, CorruptFileError):
+                raise
+            raise CorruptFileError(f"{path} está dañado: {e}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _check_block(self, block: int, at: int, size: int, end: int, crcs: Tuple[int, ...],
+                     checked: bytearray, kind: str) -> None:
+        start = at + block * size
+        with memoryview(self._buffer) as view:
+            block_crc = zlib.crc32(view[start:min(start + size, end)])
+        if block_crc != crcs[block]:
+            raise CorruptFileError(f"checksum incorrecto en el bloque {block} de {kind} de {self.path}")
+        checked[block] = 1
+        self._unchecked -= 1
+
+    def _check_records(self, start: int, stop: int) -> None:
+        for block in range(start // RECORD_BLOCK, (stop - 1) // RECORD_BLOCK + 1):
+            if not self._checked_records[block]:
+                self._check_block(block, self._table_at, RECORD_BLOCK * RECORD.size, self._pool_at,
+                                  self._record_crcs, self._checked_records, "registros")
+
+    def _check_pool(self, offset: int, length: int) -> None:
+        for block in range(offset // POOL_BLOCK, (offset + max(length, 1) - 1) // POOL_BLOCK + 1):
+            if not self._checked_pool[block]:
+                self._check_block(block, self._pool_at, POOL_BLOCK, self._pool_at + self._pool_size,
+                                  self._pool_crcs, self._checked_pool, "cadenas")
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if offset == NONE_REF:
+            return None
+        if self._unchecked:
+            self._check_pool(offset, length)
+        start = self._pool_at + offset
+        return self._buffer[start:start + length].decode('utf-8')
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Decodifica la tarea número `index` (CorruptFileError si su bloque está dañado)"""
+        if self._unchecked:
+            self._check_records(index, index + 1)
+        fields = RECORD.unpack_from(self._buffer, self._table_at + index * RECORD.size)
+        task = {field: self._string(fields[2 * i], fields[2 * i + 1]) for i, field in enumerate(STRING_FIELDS)}
+        task["priority"] = fields[-2]
+        task["completed"] = bool(fields[-1])
+        return task
+
+    def records(self, start: int, count: int) -> List[Dict[str, Any]]:
+        return [self.record(index) for index in range(start, start + count)]
+
+    def close(self):
+        self._buffer.close()
+
+class BinaryDataManager(DataManager):
+    """Guarda todas las tareas en un único snapshot binario agrupado por mes.
+
+    Funciona como el modo particionado: al inicio solo se decodifica el mes
+    actual y los demás al navegar hasta ellos, leyendo su rango de registros
+    directamente del archivo mapeado en memoria.
+    """
+
+    # Añadir tareas a un mes obliga a reescribir el snapshot entero
+    direct_import = False
+
+    def __init__(self, data_file: str = "motivate_diariamente_data.bin",
+                 backup_retention: Optional[Dict[str, int]] = None):
+        super().__init__(journal_mode=True, backup_retention=backup_retention, partitioned=True)
+        self.data_file = data_file
+        self.snapshot: Optional[BinarySnapshot] = None
+        # El hilo de guardado reemplaza el archivo mientras la UI puede estar leyendo un mes
+        self.snapshot_lock = threading.RLock()
+
+    def close(self):
+        with self.snapshot_lock:
+            if self.snapshot is not None:
+                self.snapshot.close()
+                self.snapshot = None
+
+    def _index_file(self) -> str:
+        return self.data_file
+
+    def _read_index(self) -> Dict[str, Any]:
+        with self.snapshot_lock:
+            self.close()
+            self.snapshot = BinarySnapshot(self.data_file)
+            return dict(self.snapshot.meta)
+
+    def load_month(self, month: str) -> List[Dict[str, Any]]:
+        """Decodifica solo el rango de registros de ese mes"""
+        try:
+            with self.snapshot_lock:
+                # El índice y el archivo se leen juntos: el guardado cambia los dos a la vez
+                entry = self.month_index.get(month)
+                if entry is None:
+                    return []
+                return self.snapshot.records(entry["start"], entry["count"])
+        except CorruptFileError as e:
+            print(f"Error al cargar el mes {month}: {e}")
+            return self.recover_month(month)
+
+    def save_partitions(self, data: Dict[str, Any],
+                        dirty_months: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Reescribe el snapshot completo; devuelve los datos completos para el backup"""
+        if dirty_months is None:
+            dirty_months = dict(self._dirty_months)
+        unloaded = set(data.get("unloaded_months", []))
+        meta = {key: value for key, value in data.items()
+                if key not in ("tasks", "unloaded_months", "month_aggregates")}
+
+        # El snapshot nuevo se construye y se escribe sin bloquear: la UI puede seguir
+        # leyendo meses del actual hasta que se cambia un archivo por otro
+        tasks_by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for month in sorted(unloaded):
+            tasks_by_month[month] = self.load_month(month)
+        for task in data.get("tasks", []):
+            tasks_by_month.setdefault(month_of(task), []).append(task)
+
+        # Registros agrupados por mes (las tareas sin fecha al final)
+        tasks: List[Dict[str, Any]] = []
+        months: Dict[str, Dict[str, Any]] = {}
+        for month in sorted(tasks_by_month, key=lambda m: (m == UNDATED_MONTH, m)):
+            month_tasks = tasks_by_month[month]
+            if month_tasks:
+                months[month] = {"start": len(tasks), "count": len(month_tasks),
+                                 "days": self._day_aggregates(month_tasks)}
+                tasks.extend(month_tasks)
+
+        new_file = self.data_file + ".new"
+        atomic_write(new_file, encode_snapshot(tasks, dict(meta, months=months)))
+        with self.snapshot_lock:
+            # En Windows no se puede reemplazar un archivo que sigue mapeado
+            self.close()
+            os.replace(new_file, self.data_file)
+            self.month_index = months
+            self.snapshot = BinarySnapshot(self.data_file)
+        fsync_dir(self.data_file)
+
+        with self.journal_lock:
+            for month, changes in dirty_months.items():
+                if self._dirty_months.get(month) == changes:
+                    del self._dirty_months[month]
+        return dict(meta, tasks=tasks)
+
+    def migrate_to_partitions(self) -> Dict[str, Any]:
+        """Crea el snapshot binario a partir de los datos JSON existentes"""
+        json_manager = DataManager(journal_mode=True, partitioned=os.path.exists(
+            os.path.join(self.partition_dir, "index.json")))
+        data = json_manager.load_data()
+        if json_manager.partitioned:
+            for month in data.get("unloaded_months", []):
+                data["tasks"].extend(json_manager.load_month(month))
+            data.pop("unloaded_months", None)
+            data.pop("month_aggregates", None)
+        self.save_data(data)
+        return self.load_partitions()
+
+    def recover_data(self, corrupt_file: str) -> Dict[str, Any]:
+        self.close()
+        return super().recover_data(corrupt_file)
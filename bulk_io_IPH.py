@@ -0,0 +1,321 @@
+import csv
+import os
+from datetime import date, datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional
+import codec_IPH
+
+# Importación y exportación en bloque (CSV, JSON Lines e iCalendar VTODO).
+# Los lectores y escritores trabajan fila a fila sobre el archivo abierto: nunca
+# tienen en memoria más de un lote de tareas. Un registro que no se puede leer
+# se entrega como la excepción (ValueError) en lugar de la fila, para contarlo
+# como no válido sin detener la importación
+
+BATCH_SIZE = 5000
+FIELDS = ("id", "title", "description", "category", "priority",
+          "scheduled_date", "created_at", "completed", "completed_at")
+TRUE_VALUES = {"1", "true", "yes", "y", "si", "sí", "x"}
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".ics": "ical"}
+
+def format_of(path: str) -> str:
+    """Formato según la extensión del archivo"""
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Formato no soportado: {path} (usa .csv, .jsonl o .ics)")
+    return fmt
+
+def batches(rows: Iterable[Dict[str, Any]], size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def normalize_task(row: Dict[str, Any], imported_at: Optional[str] = None) -> Dict[str, Any]:
+    """Convierte una fila leída al formato de Task.to_dict; ValueError si no es válida.
+    Las filas sin created_at reciben `imported_at`"""
+    if not isinstance(row, dict):
+        raise ValueError(f"se esperaba un objeto, no {type(row).__name__}")
+    title = _text(row, "title")
+    if not title.strip():
+        raise ValueError("la tarea no tiene título")
+    title = title.strip()
+    priority = int(row.get("priority") or 3)
+    if not 1 <= priority <= 5:
+        raise ValueError(f"prioridad fuera de rango: {priority}")
+    completed = row.get("completed")
+    if isinstance(completed, str):
+        completed = completed.strip().lower() in TRUE_VALUES
+    scheduled_date = row.get("scheduled_date") or None
+    if scheduled_date and (len(scheduled_date) != 10 or not date.fromisoformat(scheduled_date)):
+        # Valida la fecha sin cambiar su formato (fromisoformat es mucho más rápido que strptime)
+        raise ValueError(f"fecha no válida: {scheduled_date}")
+    created_at = _valid_timestamp(row, "created_at") or imported_at
+    completed_at = _valid_timestamp(row, "completed_at")
+    return {
+        "id": str(row["id"]) if row.get("id") else None,
+        "title": title,
+        "description": _text(row, "description"),
+        "category": _text(row, "category") or "Otros",
+        "priority": priority,
+        "scheduled_date": scheduled_date,
+        "created_at": created_at,
+        "completed": bool(completed),
+        "completed_at": completed_at
+    }
+
+def _text(row: Dict[str, Any], field: str) -> str:
+    """Campo de texto de la fila ("" si falta o es None); ValueError si no es una cadena"""
+    value = row.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"{field} no válido: {value!r}")
+    return value
+
+def _valid_timestamp(row: Dict[str, Any], field: str) -> Optional[str]:
+    """Timestamp ISO de la fila (o None si está vacío); ValueError si no se puede leer"""
+    value = row.get(field) or None
+    if value is not None:
+        if not isinstance(value, str):
+            raise ValueError(f"{field} no válido: {value!r}")
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{field} no válido: {value}")
+    return value
+
+# --- CSV ---
+
+def read_csv(f: IO[str]) -> Iterator[Any]:
+    reader = csv.DictReader(f)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield ValueError(f"línea {reader.line_num}: {e}")
+            continue
+        yield row
+
+def write_csv(f: IO[str], tasks: Iterable[Dict[str, Any]]) -> Iterator[int]:
+    writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for task in tasks:
+        writer.writerow({**task, "completed": int(bool(task.get("completed")))})
+        yield 1
+
+# --- JSON Lines ---
+
+def read_jsonl(f: IO[str]) -> Iterator[Any]:
+    for line_number, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield codec_IPH.loads(line)
+            except ValueError as e:
+                yield ValueError(f"línea {line_number}: {e}")
+
+def write_jsonl(f: IO[str], tasks: Iterable[Dict[str, Any]]) -> Iterator[int]:
+    for task in tasks:
+        f.write(codec_IPH.dumps({field: task.get(field) for field in FIELDS}).decode("utf-8"))
+        f.write("\n")
+        yield 1
+
+# --- iCalendar (VTODO) ---
+
+# Prioridad de iCalendar (1 = máxima, 9 = mínima, 0 = sin definir) <-> estrellas
+ICAL_TO_STARS = {0: 3, 1: 5, 2: 5, 3: 4, 4: 4, 5: 3, 6: 2, 7: 2, 8: 1, 9: 1}
+STARS_TO_ICAL = {5: 1, 4: 3, 3: 5, 2: 7, 1: 9}
+
+def _ical_unescape(value: str) -> str:
+    result, chars = [], iter(value)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, "")
+            result.append("\n" if char in "nN" else char)
+        else:
+            result.append(char)
+    return "".join(result)
+
+def _ical_split(value: str) -> List[str]:
+    """Separa una lista de valores por las comas que no están escapadas"""
+    parts, current, chars = [], [], iter(value)
+    for char in chars:
+        if char == "\\":
+            current.append(char + next(chars, ""))
+        elif char == ",":
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+def _ical_escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _ical_to_iso(value: str) -> Optional[str]:
+    """20240501T093000(Z) -> ISO en hora local; 20240501 -> 2024-05-01"""
+    value = value.strip()
+    if len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date().isoformat()
+    moment = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return moment.isoformat()
+
+def _iso_to_ical(value: Optional[str]) -> Optional[str]:
+    """Timestamp ISO -> iCalendar; None si no se puede leer (datos antiguos o editados a mano)"""
+    try:
+        return datetime.fromisoformat(value).strftime("%Y%m%dT%H%M%S")
+    except (TypeError, ValueError):
+        return None
+
+def _unfolded_lines(f: IO[str]) -> Iterator[str]:
+    """Une las líneas plegadas (las que continúan empiezan por espacio o tabulador)"""
+    current = None
+    for line in f:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+def _read_ical_property(todo: Dict[str, Any], name: str, value: str) -> None:
+    """Guarda en `todo` una propiedad de un VTODO; ValueError si su valor no es válido"""
+    if name == "UID":
+        todo["id"] = value
+    elif name == "SUMMARY":
+        todo["title"] = _ical_unescape(value)
+    elif name == "DESCRIPTION":
+        todo["description"] = _ical_unescape(value)
+    elif name == "CATEGORIES":
+        # Solo la primera categoría
+        todo["category"] = _ical_unescape(_ical_split(value)[0])
+    elif name == "PRIORITY":
+        todo["priority"] = ICAL_TO_STARS.get(int(value or 0), 3)
+    elif name == "DUE":
+        todo["scheduled_date"] = _ical_to_iso(value)[:10]
+    elif name == "CREATED":
+        todo["created_at"] = _ical_to_iso(value)
+    elif name == "COMPLETED":
+        todo["completed_at"] = _ical_to_iso(value)
+        todo["completed"] = True
+    elif name == "STATUS":
+        todo["completed"] = value.upper() == "COMPLETED"
+
+def read_ical(f: IO[str]) -> Iterator[Any]:
+    todo: Optional[Dict[str, Any]] = None
+    error: Optional[ValueError] = None
+    for line in _unfolded_lines(f):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()  # Sin parámetros (VALUE=DATE, TZID...)
+        if name == "BEGIN" and value.upper() == "VTODO":
+            todo, error = {}, None
+        elif name == "END" and value.upper() == "VTODO" and todo is not None:
+            yield error or todo
+            todo = None
+        elif todo is None or error is not None:
+            continue
+        else:
+            try:
+                _read_ical_property(todo, name, value)
+            except ValueError as e:
+                error = ValueError(f"{name}: {e}")
+
+def _fold(line: str) -> str:
+    """Pliega una línea de contenido en trozos de como mucho 75 bytes (RFC 5545)"""
+    if len(line.encode("utf-8")) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > 75:
+            parts.append(current)
+            current, size = " ", 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+def write_ical(f: IO[str], tasks: Iterable[Dict[str, Any]]) -> Iterator[int]:
+    f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Motivate Diariamente//ES\r\n")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    for task in tasks:
+        lines = ["BEGIN:VTODO", f"UID:{task['id']}", f"DTSTAMP:{stamp}",
+                 f"SUMMARY:{_ical_escape(task.get('title') or '')}"]
+        if task.get("description"):
+            lines.append(f"DESCRIPTION:{_ical_escape(task['description'])}")
+        if task.get("category"):
+            lines.append(f"CATEGORIES:{_ical_escape(task['category'])}")
+        lines.append(f"PRIORITY:{STARS_TO_ICAL.get(task.get('priority'), 5)}")
+        if task.get("scheduled_date"):
+            lines.append(f"DUE;VALUE=DATE:{task['scheduled_date'].replace('-', '')}")
+        created = _iso_to_ical(task.get("created_at"))
+        if created:
+            lines.append(f"CREATED:{created}")
+        if task.get("completed"):
+            lines.append("STATUS:COMPLETED")
+            completed = _iso_to_ical(task.get("completed_at"))
+            if completed:
+                lines.append(f"COMPLETED:{completed}")
+        else:
+            lines.append("STATUS:NEEDS-ACTION")
+        lines.append("END:VTODO")
+        f.write("".join(_fold(line) for line in lines))
+        yield 1
+    f.write("END:VCALENDAR\r\n")
+
+READERS: Dict[str, Callable[[IO[str]], Iterator[Any]]] = {
+    "csv": read_csv, "jsonl": read_jsonl, "ical": read_ical}
+WRITERS: Dict[str, Callable[[IO[str], Iterable[Dict[str, Any]]], Iterator[int]]] = {
+    "csv": write_csv, "jsonl": write_jsonl, "ical": write_ical}
+
+def import_file(path: str, add_batch: Callable[[List[Dict[str, Any]]], int],
+                fmt: Optional[str] = None, batch_size: int = BATCH_SIZE,
+                progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """Lee el archivo por lotes y pasa cada lote válido a `add_batch`, que devuelve
+    cuántas tareas añadió. `progress(leídas, añadidas)` se llama tras cada lote"""
+    reader = READERS[fmt or format_of(path)]
+    read = added = invalid = 0
+    # newline="" lo pide el módulo csv; los demás lectores no se ven afectados
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for batch in batches(reader(f), batch_size):
+            valid = []
+            # Una sola marca de tiempo por lote para las filas sin created_at
+            imported_at = datetime.now().isoformat()
+            for row_number, row in enumerate(batch, read + 1):
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    valid.append(normalize_task(row, imported_at))
+                except (TypeError, ValueError) as e:
+                    invalid += 1
+                    print(f"Error al importar la fila {row_number}: {e}")
+            read += len(batch)
+            added += add_batch(valid)
+            if progress:
+                progress(read, added)
+    return {"read": read, "added": added, "invalid": invalid}
+
+def export_file(path: str, tasks: Iterable[Dict[str, Any]], fmt: Optional[str] = None,
+                batch_size: int = BATCH_SIZE, progress: Optional[Callable[[int], None]] = None) -> int:
+    """Escribe las tareas según avanza el iterable; `progress(escritas)` cada `batch_size`"""
+    writer = WRITERS[fmt or format_of(path)]
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for _ in writer(f, tasks):
+            written += 1
+            if progress and written % batch_size == 0:
+                progress(written)
+    if progress and written % batch_size:
+        progress(written)
+    return written
@@ -0,0 +1,147 @@
+import argparse
+import sys
+from typing import List, Optional
+from core_IPH import MotivateCore
+import bulk_io_IPH
+
+# Línea de comandos sin interfaz gráfica: no importa customtkinter ni tkcalendar
+
+def format_task(task) -> str:
+    status = "✔" if task.completed else " "
+    date = task.scheduled_date or "sin fecha"
+    return f"[{status}] {task.id[:8]}  {date}  {'★' * task.priority:<5}  {task.category:<10} {task.title}"
+
+def print_achievements(core: MotivateCore, unlocked: List[str]):
+    for achievement in unlocked:
+        print(f"🌟 Logro desbloqueado: {core.achievement_manager.get_achievement_name(achievement)}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="motivate", description="Motívate Diariamente sin interfaz gráfica")
+    parser.add_argument("--storage", choices=["json", "sqlite", "binary"], default="json",
+                        help="backend de almacenamiento (por defecto: json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="añade una tarea")
+    add.add_argument("title")
+    add.add_argument("-d", "--description", default="")
+    add.add_argument("-c", "--category", default="Personal")
+    add.add_argument("-p", "--priority", type=int, choices=range(1, 6), default=3)
+    add.add_argument("--date", help="fecha programada (YYYY-MM-DD)")
+
+    complete = commands.add_parser("complete", help="marca tareas como completadas")
+    complete.add_argument("ids", nargs="+", help="id o prefijo del id")
+
+    edit = commands.add_parser("edit", help="edita una tarea")
+    edit.add_argument("id", help="id o prefijo del id")
+    edit.add_argument("--title")
+    edit.add_argument("-d", "--description")
+    edit.add_argument("-c", "--category")
+    edit.add_argument("-p", "--priority", type=int, choices=range(1, 6))
+
+    delete = commands.add_parser("delete", help="elimina tareas")
+    delete.add_argument("ids", nargs="+", help="id o prefijo del id")
+
+    listing = commands.add_parser("list", help="lista tareas")
+    listing.add_argument("--date", help="solo las programadas ese día (YYYY-MM-DD)")
+    listing.add_argument("-c", "--category")
+    status = listing.add_mutually_exclusive_group()
+    status.add_argument("--pending", action="store_true")
+    status.add_argument("--completed", action="store_true")
+
+    commands.add_parser("stats", help="muestra las estadísticas")
+
+    formats = ["json", "csv", "jsonl", "ical"]
+    export = commands.add_parser("export", help="exporta las tareas (.json, .csv, .jsonl o .ics)")
+    export.add_argument("path")
+    export.add_argument("--format", choices=formats, help="por defecto, según la extensión")
+
+    import_ = commands.add_parser("import", help="añade las tareas de un archivo (.json, .csv, .jsonl o .ics)")
+    import_.add_argument("path")
+    import_.add_argument("--format", choices=formats, help="por defecto, según la extensión")
+    return parser
+
+def file_format(args: argparse.Namespace) -> str:
+    if args.format:
+        return args.format
+    return "json" if args.path.lower().endswith(".json") else bulk_io_IPH.format_of(args.path)
+
+def print_progress(*counts: int):
+    print(f"\r{counts[0]} tareas...", end="", file=sys.stderr, flush=True)
+
+def run(core: MotivateCore, args: argparse.Namespace) -> int:
+    """Ejecuta un comando sobre datos ya cargados; devuelve el código de salida"""
+    if args.command == "add":
+        task = core.add_task(args.title, args.description, args.category, args.priority, args.date)
+        print(format_task(task))
+
+    elif args.command in ("complete", "delete"):
+        action = core.complete_tasks if args.command == "complete" else core.delete_tasks
+        _, missing = action(args.ids)
+        for task_id in missing:
+            print(f"Error: no se encontró la tarea {task_id}", file=sys.stderr)
+        if args.command == "complete":
+            print_achievements(core, core.check_achievements())
+        if missing:
+            return 1
+
+    elif args.command == "edit":
+        fields = {field: getattr(args, field) for field in ("title", "description", "category", "priority")
+                  if getattr(args, field) is not None}
+        task = core.edit_task(args.id, **fields)
+        if not task:
+            print(f"Error: no se encontró la tarea {args.id}", file=sys.stderr)
+            return 1
+        print(format_task(task))
+
+    elif args.command == "list":
+        completed = True if args.completed else False if args.pending else None
+        for task in core.list_tasks(date=args.date, category=args.category, completed=completed):
+            print(format_task(task))
+
+    elif args.command == "stats":
+        stats = core.get_stats()
+        print(f"Puntos totales: {stats['total_points']}")
+        print(f"Tareas completadas: {stats['total_tasks_completed']}")
+        print(f"Racha actual: {stats['current_streak']} días | Mejor racha: {stats['best_streak']} días")
+        for category, count in sorted(stats["tasks_by_category"].items()):
+            print(f"  {category}: {count} tareas, {stats['category_points'].get(category, 0)} puntos")
+        print(f"Logros: {len(core.achievement_manager.unlocked_achievements)}"
+              f"/{len(core.achievement_manager.achievements)}")
+
+    elif args.command == "export":
+        fmt = file_format(args)
+        if fmt == "json":
+            count = core.export_json(args.path)
+        else:
+            count = core.export_file(args.path, fmt, progress=print_progress)
+            print(file=sys.stderr)
+        print(f"{count} tareas exportadas a {args.path}")
+
+    elif args.command == "import":
+        fmt = file_format(args)
+        if fmt == "json":
+            count, unlocked = core.import_json(args.path)
+            print(f"{count} tareas importadas de {args.path}")
+        else:
+            counts, unlocked = core.import_file(args.path, fmt, progress=print_progress)
+            print(file=sys.stderr)
+            print(f"{counts['added']} tareas importadas de {args.path} "
+                  f"({counts['read'] - counts['added'] - counts['invalid']} ya existían, "
+                  f"{counts['invalid']} no válidas)")
+        print_achievements(core, unlocked)
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    core = MotivateCore(args.storage)
+    core.load()
+    try:
+        code = run(core, args)
+        if args.command not in ("list", "stats", "export"):
+            core.save()
+        return code
+    finally:
+        core.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import json
+from datetime import datetime
+from typing import Any, Union
+
+# Se usa la librería JSON más rápida disponible; todas producen el mismo JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKENDS = [name for name, module in (("orjson", orjson), ("msgspec", msgspec)) if module] + ["json"]
+backend = BACKENDS[0]
+
+def use_backend(name: str):
+    """Fuerza un backend concreto ("orjson", "msgspec" o "json")"""
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Backend JSON no disponible: {name}")
+    backend = name
+
+def _default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serializa a JSON UTF-8; `pretty` lo indenta para que sea legible"""
+    if backend == "orjson":
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if backend == "msgspec":
+        raw = msgspec.json.encode(obj, enc_hook=_default)
+        return msgspec.json.format(raw, indent=2) if pretty else raw
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_default).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserializa JSON; cualquier error de formato se lanza como ValueError"""
+    if backend == "orjson":
+        return orjson.loads(data)
+    if backend == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(data)
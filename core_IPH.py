@@ -0,0 +1,263 @@
+import copy
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from task_manager_IPH import Task, TaskManager
+from stats_manager_IPH import StatsManager, STATS_VERSION
+from data_manager_IPH import DataManager
+from safe_io_IPH import read_json, write_json
+import bulk_io_IPH
+
+# Este módulo no importa customtkinter ni tkcalendar: lo usan la interfaz,
+# la línea de comandos (cli_IPH) y cualquier script sin pantalla
+
+def create_data_manager(storage: str = "json") -> DataManager:
+    """Crea el backend de almacenamiento elegido ("json", "sqlite" o "binary")"""
+    if storage == "sqlite":
+        from sqlite_data_manager_IPH import SQLiteDataManager
+        return SQLiteDataManager()
+    if storage == "binary":
+        from binary_data_manager_IPH import BinaryDataManager
+        return BinaryDataManager()
+    return DataManager(journal_mode=True, partitioned=True, compact_json=True)
+
+class MotivateCore:
+    """Tareas, estadísticas, logros y almacenamiento de la aplicación, sin interfaz"""
+
+    def __init__(self, storage: str = "json", data_manager: Optional[DataManager] = None):
+        self.data_manager = data_manager or create_data_manager(storage)
+        self.task_manager = TaskManager()
+        self.stats_manager = StatsManager()
+        self._achievement_manager = None
+        self.username: Optional[str] = None
+        # Las estadísticas se derivan de cada cambio de tarea (también al deshacer)
+        self.task_manager.add_listener(self.stats_manager.on_task_change, self.stats_manager.on_tasks_change)
+        self.task_manager.add_update_listener(self.stats_manager.before_update)
+        self.task_manager.add_load_listener(self.stats_manager.adopt)
+
+    @property
+    def achievement_manager(self):
+        """Gestor de logros; achievement_manager_IPH se importa al usarlo por primera vez
+        (en la app, en la fase diferida "logros", después del primer frame)"""
+        if self._achievement_manager is None:
+            from achievement_manager_IPH import AchievementManager
+            self._achievement_manager = AchievementManager()
+        return self._achievement_manager
+
+    def load(self, achievements: bool = True) -> Tuple[Dict[str, Any], List[str]]:
+        """Carga los datos guardados; devuelve los datos y los logros superados desde el último guardado.
+
+        A partir de aquí cada cambio de tareas se registra en el journal. Con
+        achievements=False los logros se cargan después con load_achievements.
+        """
+        saved_data = self.data_manager.load_data()
+        self.task_manager.add_listener(self.data_manager.journal_task_change,
+                                       self.data_manager.journal_task_changes)
+        if not saved_data:
+            return saved_data, []
+
+        self.task_manager.load_tasks(saved_data.get("tasks", []))
+        if self.data_manager.partitioned:
+            # El resto de meses se cargan cuando se necesitan (también los que
+            # se escriban después directamente, como en import_file)
+            self.task_manager.set_month_loader(
+                self.data_manager.load_month,
+                saved_data.get("unloaded_months", []),
+                saved_data.get("month_aggregates", {})
+            )
+            self.task_manager.set_store_queries(self.data_manager.store_queries())
+
+        saved_stats = saved_data.get("stats", {})
+        self.stats_manager.load_stats(saved_stats)
+        # Las completadas de cada mes se registran al cargarlo (load listener)
+        self.stats_manager.adopt(self.task_manager.tasks)
+        if saved_stats.get("version") != STATS_VERSION or self.data_manager.journal_entries != 0:
+            # Datos de una versión anterior o cierre inesperado: recalcular con todo el historial
+            self.task_manager.load_all_months()
+            self.stats_manager.rebuild()
+
+        self.username = saved_data.get("username")
+        return saved_data, self.load_achievements(saved_data) if achievements else []
+
+    def load_achievements(self, saved_data: Dict[str, Any]) -> List[str]:
+        """Restaura los logros guardados; devuelve los superados desde el último guardado"""
+        # Solo se evalúan las métricas que cambiaron desde entonces
+        self.achievement_manager.load_state(saved_data.get("achievements", {}),
+                                            saved_data.get("achievement_watermark", {}))
+        return self.check_achievements()
+
+    def capture_data(self) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Copia del estado completo, junto con la marca del journal que cubre"""
+        data = {
+            "tasks": [task.to_dict() for task in self.task_manager.tasks],
+            "stats": copy.deepcopy(self.stats_manager.stats),
+            **self.achievement_manager.export_state()
+        }
+        if self.username is not None:
+            data["username"] = self.username
+        if self.data_manager.partitioned:
+            data["unloaded_months"] = self.task_manager.get_unloaded_months()
+        return data, self.data_manager.journal_mark()
+
+    def save(self) -> None:
+        data, mark = self.capture_data()
+        self.data_manager.save_data(data, mark)
+
+    def close(self) -> None:
+        if hasattr(self.data_manager, "close"):
+            self.data_manager.close()
+
+    def check_achievements(self) -> List[str]:
+        return self.achievement_manager.check_achievements(self.stats_manager.get_stats())
+
+    def find_task(self, task_id: str) -> Optional[Task]:
+        """Busca una tarea por id completo o por un prefijo único del id"""
+        task = self.task_manager.get_task_by_id(task_id)
+        if task:
+            return task
+        matches = [task for task in self.task_manager.get_all_tasks() if task.id.startswith(task_id)]
+        return matches[0] if len(matches) == 1 else None
+
+    def add_task(self, title: str, description: str = "", category: str = "Personal",
+                 priority: int = 3, scheduled_date: Optional[str] = None) -> Task:
+        return self.task_manager.add_task(title, description, category, priority, scheduled_date)
+
+    def complete_task(self, task_id: str) -> Optional[Task]:
+        task = self.find_task(task_id)
+        return self.task_manager.complete_task(task.id) if task else None
+
+    def edit_task(self, task_id: str, **fields) -> Optional[Task]:
+        """Edita title, description, category y/o priority; el resto de campos no cambia"""
+        task = self.find_task(task_id)
+        if not task:
+            return None
+        return self.task_manager.edit_task(
+            task.id,
+            fields.get("title", task.title),
+            fields.get("description", task.description),
+            fields.get("category", task.category),
+            fields.get("priority", task.priority)
+        )
+
+    def delete_task(self, task_id: str) -> bool:
+        task = self.find_task(task_id)
+        return self.task_manager.delete_task(task.id) if task else False
+
+    def _find_tasks(self, task_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """Ids completos de los ids o prefijos dados, y los que no se encontraron"""
+        found, missing = [], []
+        for task_id in task_ids:
+            task = self.find_task(task_id)
+            if task:
+                found.append(task.id)
+            else:
+                missing.append(task_id)
+        return found, missing
+
+    def complete_tasks(self, task_ids: List[str]) -> Tuple[List[Task], List[str]]:
+        """Completa varias tareas como una sola acción; devuelve las completadas y los ids no encontrados"""
+        found, missing = self._find_tasks(task_ids)
+        return self.task_manager.complete_tasks(found), missing
+
+    def delete_tasks(self, task_ids: List[str]) -> Tuple[List[Task], List[str]]:
+        """Elimina varias tareas como una sola acción; devuelve las eliminadas y los ids no encontrados"""
+        found, missing = self._find_tasks(task_ids)
+        return self.task_manager.delete_tasks(found), missing
+
+    def list_tasks(self, date: Optional[str] = None, category: Optional[str] = None,
+                   completed: Optional[bool] = None) -> List[Task]:
+        """Tareas filtradas por fecha programada, categoría y/o estado"""
+        if date:
+            tasks = self.task_manager.get_tasks_for_date(date)
+        elif category:
+            tasks = self.task_manager.get_tasks_by_category(category)
+        elif completed is not None:
+            tasks = (self.task_manager.get_completed_tasks() if completed
+                     else self.task_manager.get_pending_tasks())
+        else:
+            tasks = self.task_manager.get_all_tasks()
+        return [task for task in tasks
+                if (category is None or task.category == category)
+                and (completed is None or task.completed == completed)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.stats_manager.get_stats()
+
+    def export_json(self, path: str) -> int:
+        """Exporta todas las tareas y estadísticas al formato JSON de archivo único"""
+        tasks = self.task_manager.get_all_tasks()
+        data, _ = self.capture_data()
+        data.pop("unloaded_months", None)
+        write_json(path, data)
+        return len(tasks)
+
+    def import_json(self, path: str) -> Tuple[int, List[str]]:
+        """Añade las tareas de un archivo JSON cuyo id no exista; devuelve cuántas y los logros nuevos"""
+        tasks_data = read_json(path).get("tasks", [])
+        self.task_manager.load_all_months()
+        new_tasks = [task for task in tasks_data
+                     if self.task_manager.get_task_by_id(task.get("id")) is None]
+        imported = self.task_manager.import_tasks(new_tasks)
+        return len(imported), self.check_achievements()
+
+    def iter_task_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Todas las tareas como diccionarios; los meses no cargados se leen de uno en uno sin cargarlos"""
+        for task in self.task_manager.tasks:
+            yield task.to_dict()
+        for month in self.task_manager.get_unloaded_months():
+            yield from self.data_manager.load_month(month)
+
+    def import_file(self, path: str, fmt: Optional[str] = None,
+                    progress: Optional[Callable[[int, int], None]] = None) -> Tuple[Dict[str, int], List[str]]:
+        """Importa un CSV, JSON Lines o iCalendar por lotes; devuelve los contadores y los logros nuevos.
+
+        Las tareas de los meses cargados se añaden al TaskManager. Las del resto
+        se escriben directamente en el almacenamiento y solo se suman a las
+        estadísticas y a los agregados del calendario, sin quedarse en memoria.
+        Los ids repetidos se buscan en memoria y, para los meses no cargados,
+        en el almacenamiento con una consulta por lote.
+        """
+        task_manager = self.task_manager
+        direct = self.data_manager.partitioned and self.data_manager.direct_import
+        if not direct:
+            task_manager.load_all_months()
+        loaded_months = {TaskManager._month_of(task.scheduled_date) for task in task_manager.tasks}
+        loaded_months.add(datetime.now().strftime("%Y-%m"))
+
+        def add_batch(tasks_data: List[Dict[str, Any]]) -> int:
+            in_memory, stored = [], []
+            batch_ids = set()
+            for task in tasks_data:
+                if task["id"]:
+                    # Las importadas en lotes anteriores ya están en memoria o guardadas
+                    if task["id"] in batch_ids or task_manager.get_task_by_id(task["id"]):
+                        continue
+                    batch_ids.add(task["id"])
+                if not direct or TaskManager._month_of(task["scheduled_date"]) in loaded_months:
+                    in_memory.append(task)
+                else:
+                    stored.append(task)
+            if stored:
+                duplicates = self.data_manager.existing_ids([task for task in stored if task["id"]])
+                stored = [task for task in stored if task["id"] not in duplicates]
+            # Índices, estadísticas y journal se actualizan una vez por lote
+            task_manager.import_tasks(in_memory)
+            if stored:
+                tasks = [Task.from_dict(task) for task in stored]
+                self.stats_manager.add_unloaded(tasks)
+                task_manager.add_unloaded_tasks(tasks)
+                self.data_manager.import_batch([task.to_dict() for task in tasks])
+            return len(in_memory) + len(stored)
+
+        if direct:
+            self.data_manager.begin_import()
+        try:
+            counts = bulk_io_IPH.import_file(path, add_batch, fmt, progress=progress)
+        finally:
+            if direct:
+                self.data_manager.finish_import()
+        return counts, self.check_achievements()
+
+    def export_file(self, path: str, fmt: Optional[str] = None,
+                    progress: Optional[Callable[[int], None]] = None) -> int:
+        """Exporta todas las tareas a CSV, JSON Lines o iCalendar sin cargar todos los meses"""
+        return bulk_io_IPH.export_file(path, self.iter_task_dicts(), fmt, progress=progress)
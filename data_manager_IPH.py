@@ -1,13 +1,58 @@
-import json
 import os
+import threading
 from datetime import datetime
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from backup_store_IPH import BackupStore
+from safe_io_IPH import CorruptFileError, atomic_write, read_json, write_json
+import codec_IPH
+
+UNDATED_MONTH = "undated"  # Partición de las tareas sin fecha programada
+
+def month_of(task: Dict[str, Any]) -> str:
+    """Mes ("YYYY-MM") de la partición a la que pertenece una tarea guardada"""
+    scheduled_date = task.get("scheduled_date")
+    return scheduled_date[:7] if scheduled_date else UNDATED_MONTH
 
 class DataManager:
-    def __init__(self):
+    # Si import_batch puede escribir tareas en meses no cargados sin reescribir todo
+    direct_import = True
+
+    def __init__(self, journal_mode: bool = False, compact_every: int = 500,
+                 backup_retention: Optional[Dict[str, int]] = None,
+                 partitioned: bool = False, compact_json: bool = False):
         self.data_file = "motivate_diariamente_data.json"
+        self.journal_file = "motivate_diariamente_data.journal"
         self.backup_dir = "backups"
+        # En modo particionado las tareas se guardan en un archivo por mes
+        # programado y al inicio solo se carga el mes actual
+        self.partitioned = partitioned
+        self.partition_dir = "motivate_diariamente_data"
+        self.month_index: Dict[str, Dict[str, Any]] = {}
+        # Mes -> número de cambios; el contador permite saber si un mes volvió
+        # a cambiar mientras se guardaba un snapshot anterior
+        self._dirty_months: Dict[str, int] = {}
+        # En modo journal cada cambio se añade como un registro compacto y
+        # el snapshot completo solo se reescribe al compactar
+        self.journal_mode = journal_mode
+        # JSON sin indentar para los archivos principales (los backups siguen indentados)
+        self.compact_json = compact_json
+        self.compact_every = compact_every
+        self.journal_entries = 0
+        # El journal se escribe desde el hilo de Tk y se recorta desde el de guardado
+        self.journal_lock = threading.Lock()
+        # Bytes y registros ya descartados del journal: las marcas son absolutas
+        # para seguir siendo válidas después de recortarlo
+        self._journal_base = (0, 0)
+        # Meses con tareas importadas pendientes de unir a su partición
+        self._import_months = set()
+        # Ids guardados del último mes consultado por existing_ids: (mes, ids)
+        self._ids_cache: Optional[Tuple[str, set]] = None
         self.ensure_backup_dir()
+        self.backup_store = BackupStore(
+            os.path.join(self.backup_dir, "store"),
+            retention=backup_retention,
+            json_default=self.datetime_handler
+        )
 
     def ensure_backup_dir(self):
         if not os.path.exists(self.backup_dir):
@@ -18,42 +63,416 @@ class DataManager:
             return obj.isoformat()
         raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
-    def save_data(self, data: Dict[str, Any]):
+    def save_data(self, data: Dict[str, Any], mark: Optional[Dict[str, Any]] = None):
+        """Guarda el snapshot; `mark` (de journal_mark) indica hasta dónde lo cubre el journal"""
         try:
+            if mark is None:
+                mark = self.journal_mark()
+
             # Guardar datos principales
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=self.datetime_handler)
-            
+            if self.partitioned:
+                data = self.save_partitions(data, mark["dirty_months"])
+            else:
+                write_json(self.data_file, data, pretty=not self.compact_json)
+
+            # El snapshot ya contiene lo registrado en el journal hasta la marca
+            self.clear_journal(mark)
+
             # Crear backup
             self.create_backup(data)
         except Exception as e:
             print(f"Error al guardar datos: {e}")
 
     def load_data(self) -> Dict[str, Any]:
+        if self.partitioned:
+            return self.load_partitions()
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                data = read_json(self.data_file)
+            elif os.path.exists(self.journal_file):
+                data = self.create_empty_data()
+            else:
+                return self.create_empty_data()
+            self.replay_journal(data)
+            return data
+        except CorruptFileError as e:
+            print(f"Error al cargar datos: {e}")
+            return self.recover_data(self.data_file)
+        except Exception as e:
+            print(f"Error al cargar datos: {e}")
             return self.create_empty_data()
-        except json.JSONDecodeError:
-            # Si el archivo está corrupto, crear uno nuevo
-            empty_data = self.create_empty_data()
-            self.save_data(empty_data)
-            return empty_data
+
+    def append_journal(self, record: Dict[str, Any]):
+        """Añade un registro compacto (una línea JSON) al journal"""
+        try:
+            line = codec_IPH.dumps(record)
+            with self.journal_lock:
+                with open(self.journal_file, 'ab') as f:
+                    f.write(line + b"\n")
+                self.journal_entries += 1
+        except Exception as e:
+            print(f"Error al escribir journal: {e}")
+
+    def journal_task_change(self, event: str, task):
+        """Registra en el journal el cambio de una tarea emitido por TaskManager"""
+        with self.journal_lock:
+            month = task.scheduled_date[:7] if task.scheduled_date else UNDATED_MONTH
+            self._dirty_months[month] = self._dirty_months.get(month, 0) + 1
+        if event == "removed":
+            self.append_journal({"op": "delete", "id": task.id, "date": task.scheduled_date})
+        else:
+            self.append_journal({"op": "put", "task": task.to_dict()})
+
+    def journal_task_changes(self, changes: List[Tuple[str, Any]]):
+        """Registra de una vez los cambios de una operación en bloque"""
+        lines = []
+        with self.journal_lock:
+            for event, task in changes:
+                month = task.scheduled_date[:7] if task.scheduled_date else UNDATED_MONTH
+                self._dirty_months[month] = self._dirty_months.get(month, 0) + 1
+        for event, task in changes:
+            if event == "removed":
+                record = {"op": "delete", "id": task.id, "date": task.scheduled_date}
+            else:
+                record = {"op": "put", "task": task.to_dict()}
+            lines.append(codec_IPH.dumps(record))
+        try:
+            with self.journal_lock:
+                with open(self.journal_file, 'ab') as f:
+                    f.write(b"\n".join(lines) + b"\n")
+                self.journal_entries += len(lines)
         except Exception as e:
+            print(f"Error al escribir journal: {e}")
+
+    def needs_compaction(self) -> bool:
+        """Indica si el journal ha crecido lo suficiente como para volcarlo al snapshot"""
+        return self.journal_entries >= self.compact_every
+
+    def journal_mark(self) -> Dict[str, Any]:
+        """Posición actual del journal y meses modificados, para guardar un snapshot tomado ahora"""
+        with self.journal_lock:
+            size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            base_offset, base_entries = self._journal_base
+            return {"offset": base_offset + size, "entries": base_entries + self.journal_entries,
+                    "dirty_months": dict(self._dirty_months)}
+
+    def _read_journal(self) -> Iterator[Dict[str, Any]]:
+        """Lee los registros del journal, contándolos en journal_entries"""
+        self.journal_entries = 0
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = codec_IPH.loads(line)
+                except ValueError:
+                    # Última línea truncada por un cierre inesperado
+                    break
+                self.journal_entries += 1
+                yield record
+
+    def replay_journal(self, data: Dict[str, Any], records: Optional[List[Dict[str, Any]]] = None):
+        """Aplica sobre el snapshot los registros pendientes del journal"""
+        if records is None:
+            records = self._read_journal()
+
+        tasks = list(data.get("tasks", []))
+        positions = {task["id"]: i for i, task in enumerate(tasks)}
+        for record in records:
+            op = record.get("op")
+            if op == "put":
+                task = record["task"]
+                index = positions.get(task["id"])
+                if index is None:
+                    positions[task["id"]] = len(tasks)
+                    tasks.append(task)
+                else:
+                    tasks[index] = task
+            elif op == "delete":
+                index = positions.pop(record["id"], None)
+                if index is not None:
+                    tasks[index] = None
+            elif op == "meta":
+                data.update(record["data"])
+
+        data["tasks"] = [task for task in tasks if task is not None]
+
+    def _index_file(self) -> str:
+        return os.path.join(self.partition_dir, "index.json")
+
+    def _partition_file(self, month: str) -> str:
+        return os.path.join(self.partition_dir, f"tasks_{month}.json")
+
+    def _read_index(self) -> Dict[str, Any]:
+        """Meta y, en "months", el índice de meses guardados"""
+        return read_json(self._index_file())
+
+    def load_partitions(self) -> Dict[str, Any]:
+        """Carga el índice, el mes actual y los meses tocados por el journal"""
+        try:
+            if not os.path.exists(self._index_file()):
+                return self.migrate_to_partitions()
+
+            data = self._read_index()
+            self.month_index = data.pop("months", {})
+
+            records = list(self._read_journal())
+            touched = set()
+            for record in records:
+                if record.get("op") == "put":
+                    touched.add(month_of(record["task"]))
+                elif record.get("op") == "delete":
+                    if "date" not in record:
+                        # Registro antiguo sin fecha: no se sabe a qué mes pertenece
+                        touched.update(self.month_index)
+                    else:
+                        touched.add(month_of({"scheduled_date": record["date"]}))
+            months = touched | {datetime.now().strftime("%Y-%m")}
+
+            tasks = []
+            for month in sorted(months):
+                tasks.extend(self.load_month(month))
+            data["tasks"] = tasks
+            self.replay_journal(data, records)
+            self._dirty_months = dict.fromkeys(touched, 1)
+
+            unloaded = [month for month in self.month_index if month not in months]
+            data["unloaded_months"] = unloaded
+            data["month_aggregates"] = {month: self.month_index[month]["days"] for month in unloaded}
+            return data
+        except CorruptFileError as e:
+            print(f"Error al cargar datos: {e}")
+            self.recover_data(self._index_file())
+            return self.load_partitions()
+        except OSError as e:
             print(f"Error al cargar datos: {e}")
             return self.create_empty_data()
 
+    def load_month(self, month: str) -> List[Dict[str, Any]]:
+        """Lee las tareas guardadas de un mes ("YYYY-MM" o "undated")"""
+        if month not in self.month_index:
+            return []
+        try:
+            return read_json(self._partition_file(month))
+        except (CorruptFileError, FileNotFoundError) as e:
+            print(f"Error al cargar el mes {month}: {e}")
+            return self.recover_month(month)
+
+    def store_queries(self) -> Dict[str, Callable[[Any], List[Dict[str, Any]]]]:
+        """Consultas indexadas sobre toda la historia (ver TaskManager.set_store_queries);
+        los archivos por mes no tienen índices, así que ninguna"""
+        return {}
+
+    def save_partitions(self, data: Dict[str, Any],
+                        dirty_months: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Escribe los meses cargados que cambiaron y el índice; devuelve el snapshot completo"""
+        if dirty_months is None:
+            dirty_months = dict(self._dirty_months)
+        unloaded = set(data.get("unloaded_months", []))
+        meta = {key: value for key, value in data.items()
+                if key not in ("tasks", "unloaded_months", "month_aggregates")}
+
+        tasks_by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for task in data.get("tasks", []):
+            tasks_by_month.setdefault(month_of(task), []).append(task)
+
+        months = (set(tasks_by_month) | set(self.month_index)) - unloaded
+        if self.journal_mode and os.path.exists(self._index_file()):
+            # Con journal sabemos exactamente qué meses se modificaron
+            months &= set(dirty_months)
+
+        os.makedirs(self.partition_dir, exist_ok=True)
+        for month in months:
+            month_tasks = tasks_by_month.get(month, [])
+            if month_tasks:
+                write_json(self._partition_file(month), month_tasks, pretty=not self.compact_json)
+                self.month_index[month] = {"count": len(month_tasks), "days": self._day_aggregates(month_tasks)}
+            elif month in self.month_index:
+                os.remove(self._partition_file(month))
+                del self.month_index[month]
+
+        write_json(self._index_file(), dict(meta, months=self.month_index), pretty=not self.compact_json)
+        with self.journal_lock:
+            # Los meses modificados después del snapshot se guardarán la próxima vez
+            for month, changes in dirty_months.items():
+                if self._dirty_months.get(month) == changes:
+                    del self._dirty_months[month]
+
+        # El backup necesita la historia completa, incluidos los meses no cargados
+        full_tasks = list(data.get("tasks", []))
+        for month in sorted(unloaded):
+            full_tasks.extend(self.load_month(month))
+        return dict(meta, tasks=full_tasks)
+
+    # --- Importación en bloque directa a las particiones ---
+
+    def _import_file(self, month: str) -> str:
+        return os.path.join(self.partition_dir, f"import_{month}.jsonl")
+
+    def begin_import(self):
+        """Prepara una importación directa de tareas de meses no cargados"""
+        os.makedirs(self.partition_dir, exist_ok=True)
+        # Restos de una importación interrumpida
+        for name in os.listdir(self.partition_dir):
+            if name.startswith("import_") and name.endswith(".jsonl"):
+                os.remove(os.path.join(self.partition_dir, name))
+        self._import_months.clear()
+        self._ids_cache = None
+        # Las estadísticas guardadas dejan de cubrir todas las tareas hasta el próximo
+        # guardado: si la app se cierra antes, se recalculan al cargar
+        self.append_journal({"op": "meta", "data": {"stats": {}}})
+
+    def import_batch(self, tasks: List[Dict[str, Any]]):
+        """Añade tareas de meses no cargados a un archivo temporal por mes, sin leer la partición"""
+        lines_by_month: Dict[str, List[bytes]] = {}
+        for task in tasks:
+            lines_by_month.setdefault(month_of(task), []).append(codec_IPH.dumps(task))
+        for month, lines in lines_by_month.items():
+            with open(self._import_file(month), 'ab') as f:
+                f.write(b"\n".join(lines) + b"\n")
+            self._import_months.add(month)
+        if self._ids_cache is not None and self._ids_cache[0] in lines_by_month:
+            self._ids_cache[1].update(task["id"] for task in tasks if month_of(task) == self._ids_cache[0])
+
+    def existing_ids(self, tasks: List[Dict[str, Any]]) -> set:
+        """Ids de `tasks` que ya están guardados en el mes de cada tarea (en su partición o
+        importados antes en esta importación). Solo se tienen en memoria los ids de un mes"""
+        found = set()
+        for task in sorted(tasks, key=month_of):
+            month = month_of(task)
+            if self._ids_cache is None or self._ids_cache[0] != month:
+                self._ids_cache = (month, self._stored_month_ids(month))
+            if task["id"] in self._ids_cache[1]:
+                found.add(task["id"])
+        return found
+
+    def _stored_month_ids(self, month: str) -> set:
+        ids = {task["id"] for task in self.load_month(month)}
+        if month in self._import_months:
+            with open(self._import_file(month), 'rb') as f:
+                ids.update(codec_IPH.loads(line)["id"] for line in f if line.strip())
+        return ids
+
+    def finish_import(self):
+        """Une cada archivo temporal a su partición (un mes en memoria cada vez) y guarda el índice"""
+        for month in sorted(self._import_months):
+            tasks = self.load_month(month)
+            with open(self._import_file(month), 'rb') as f:
+                tasks.extend(codec_IPH.loads(line) for line in f if line.strip())
+            write_json(self._partition_file(month), tasks, pretty=not self.compact_json)
+            self.month_index[month] = {"count": len(tasks), "days": self._day_aggregates(tasks)}
+            os.remove(self._import_file(month))
+        self._import_months.clear()
+        self._ids_cache = None
+        index = self._read_index() if os.path.exists(self._index_file()) else {}
+        write_json(self._index_file(), dict(index, months=self.month_index), pretty=not self.compact_json)
+
+    @staticmethod
+    def _day_aggregates(tasks: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+        """[total, completadas, alta prioridad] por día, igual que TaskManager"""
+        days: Dict[str, List[int]] = {}
+        for task in tasks:
+            if task.get("scheduled_date"):
+                counts = days.setdefault(task["scheduled_date"], [0, 0, 0])
+                counts[0] += 1
+                counts[1] += 1 if task.get("completed") else 0
+                counts[2] += 1 if task.get("priority", 0) >= 4 else 0
+        return days
+
+    def migrate_to_partitions(self) -> Dict[str, Any]:
+        """Convierte el archivo único existente al formato particionado por mes"""
+        self.partitioned = False
+        data = self.load_data()
+        self.partitioned = True
+        if os.path.exists(self.data_file) or os.path.exists(self.journal_file):
+            self.save_data(data)
+            if os.path.exists(self.data_file):
+                os.replace(self.data_file, self.data_file + ".migrated")
+        return data
+
+    def clear_journal(self, mark: Optional[Dict[str, Any]] = None):
+        """Descarta el journal hasta la marca (o entero) una vez que está en el snapshot"""
+        with self.journal_lock:
+            base_offset, base_entries = self._journal_base
+            size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            offset = size if mark is None else mark["offset"] - base_offset
+            if offset <= 0:
+                # Un snapshot posterior ya descartó esta parte
+                return
+            if offset >= size:
+                if size:
+                    os.remove(self.journal_file)
+                self._journal_base = (base_offset + size, base_entries + self.journal_entries)
+                self.journal_entries = 0
+                return
+            # Se conservan los registros añadidos después de tomar el snapshot
+            with open(self.journal_file, 'rb') as f:
+                f.seek(offset)
+                tail = f.read()
+            atomic_write(self.journal_file, tail)
+            dropped = mark["entries"] - base_entries
+            self._journal_base = (mark["offset"], mark["entries"])
+            self.journal_entries -= dropped
+
+    def recover_data(self, corrupt_file: str) -> Dict[str, Any]:
+        """Sustituye un archivo dañado por el backup válido más reciente más el journal.
+
+        El archivo dañado se conserva con la extensión .corrupt.
+        """
+        os.replace(corrupt_file, corrupt_file + ".corrupt")
+        if not self.backup_store.exists():
+            self.migrate_legacy_backups()
+
+        recovered = self.backup_store.latest_valid()
+        if recovered is None:
+            data = self.create_empty_data()
+        else:
+            backup_name, data = recovered
+            print(f"Datos recuperados desde {backup_name}")
+        self.replay_journal(data)
+
+        if self.partitioned:
+            # Se reescriben todos los meses a partir del backup
+            self.month_index = {}
+        self.save_data(data)
+        return data
+
+    def recover_month(self, month: str) -> List[Dict[str, Any]]:
+        """Tareas de un mes cuyo archivo está dañado, tomadas del backup más reciente"""
+        recovered = self.backup_store.latest_valid()
+        if recovered is None:
+            return []
+        with self.journal_lock:
+            # Se vuelve a escribir en el próximo guardado
+            self._dirty_months[month] = self._dirty_months.get(month, 0) + 1
+        return [task for task in recovered[1].get("tasks", []) if month_of(task) == month]
+
     def create_backup(self, data: Dict[str, Any]):
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(self.backup_dir, f"backup_{timestamp}.json")
-            
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=self.datetime_handler)
+            if not self.backup_store.exists():
+                self.migrate_legacy_backups()
+            self.backup_store.add(data)
         except Exception as e:
             print(f"Error al crear backup: {e}")
 
+    def _legacy_backups(self) -> List[str]:
+        """Backups sueltos con el formato anterior (backup_YYYYMMDD_HHMMSS.json)"""
+        return sorted(f for f in os.listdir(self.backup_dir)
+                      if f.startswith("backup_") and f.endswith(".json"))
+
+    def migrate_legacy_backups(self):
+        """Mueve los backups sueltos al almacén deduplicado"""
+        for backup_file in self._legacy_backups():
+            backup_path = os.path.join(self.backup_dir, backup_file)
+            try:
+                created = datetime.strptime(backup_file[len("backup_"):-len(".json")], "%Y%m%d_%H%M%S")
+                self.backup_store.add(read_json(backup_path), created=created)
+                os.remove(backup_path)
+            except (ValueError, OSError) as e:
+                print(f"Error al migrar backup {backup_file}: {e}")
+
     def create_empty_data(self) -> Dict[str, Any]:
         return {
             "tasks": [],
@@ -71,17 +490,24 @@ class DataManager:
         }
 
     def restore_backup(self, backup_file: str) -> Dict[str, Any]:
+        try:
+            data = self.backup_store.restore(backup_file)
+            if data is not None:
+                return data
+        except (OSError, ValueError) as e:
+            print(f"Error al restaurar backup: {e}")
+            return self.create_empty_data()
+
         backup_path = os.path.join(self.backup_dir, backup_file)
         try:
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
+            return read_json(backup_path)
+        except (CorruptFileError, FileNotFoundError) as e:
             print(f"Error al restaurar backup: {e}")
             return self.create_empty_data()
 
     def list_backups(self):
         try:
-            return [f for f in os.listdir(self.backup_dir) if f.startswith("backup_") and f.endswith(".json")]
+            return self.backup_store.list_names() + self._legacy_backups()
         except Exception as e:
             print(f"Error al listar backups: {e}")
             return []
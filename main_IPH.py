@@ -1,49 +1,73 @@
-import customtkinter as ctk
-from task_manager_IPH import TaskManager, Task  # Importar Task explícitamente
-from ui_manager_IPH import UIManager
-from data_manager_IPH import DataManager
-from stats_manager_IPH import StatsManager
+import argparse
+from startup_IPH import StartupProfile
+
+# customtkinter, la interfaz y el autoguardado se importan dentro de MotivateApp,
+# cada uno en su fase del arranque, para poder medirlos con --startup-profile
 
 class MotivateApp:
-    def __init__(self):
-        self.root = ctk.CTk()
-        self.root.title("Motívate Diariamente")
-        
-        # Inicializar managers
-        self.data_manager = DataManager()
-        self.task_manager = TaskManager()
-        self.stats_manager = StatsManager()
-        
-        # Cargar datos guardados
-        saved_data = self.data_manager.load_data()
-        
-        # Inicializar UI Manager con las dependencias necesarias
-        self.ui_manager = UIManager(
-            root=self.root,
-            task_manager=self.task_manager,
-            stats_manager=self.stats_manager
-        )
+    def __init__(self, storage: str = "json", autosave_delay_ms: int = 1500,
+                 profile: StartupProfile = None, show_profile: bool = False):
+        # Tiempos del arranque; con show_profile se imprimen al terminar
+        self.profile = profile or StartupProfile()
+        self.show_profile = show_profile
+        with self.profile.phase("importar customtkinter"):
+            import customtkinter as ctk
+        with self.profile.phase("ventana principal"):
+            self.root = ctk.CTk()
+            self.root.title("Motívate Diariamente")
         
-        # Verificar si es la primera ejecución
-        is_first_run = not saved_data or "username" not in saved_data
-        
-        if saved_data:
-            # Cargar tareas
-            for task_data in saved_data.get("tasks", []):
-                self.task_manager.tasks.append(Task(**task_data))
+        with self.profile.phase("cargar datos"):
+            from core_IPH import MotivateCore
+            from autosave_IPH import AutoSaver
+            # Tareas, estadísticas, logros y almacenamiento (sin interfaz)
+            self.core = MotivateCore(storage)
+            self.data_manager = self.core.data_manager
+            self.task_manager = self.core.task_manager
+            self.stats_manager = self.core.stats_manager
+            
+            # Los guardados completos se agrupan y se escriben fuera del hilo de Tk
+            self.autosaver = AutoSaver(self.root, self.capture_data, self.write_data,
+                                       delay_ms=autosave_delay_ms)
             
-            # Cargar estadísticas
-            saved_stats = saved_data.get("stats", {})
-            default_stats = self.stats_manager.stats.copy()
-            default_stats.update(saved_stats)
-            self.stats_manager.stats = default_stats
+            # Cargar datos guardados (también registra cada cambio de tareas en el
+            # journal); los logros se evalúan después del primer frame
+            saved_data, _ = self.core.load(achievements=False)
+        
+        with self.profile.phase("importar interfaz"):
+            from ui_manager_IPH import UIManager
+        with self.profile.phase("construir interfaz"):
+            # Panel de estadísticas y calendario se crean después del primer frame
+            self.ui_manager = UIManager(
+                root=self.root,
+                task_manager=self.task_manager,
+                stats_manager=self.stats_manager,
+                achievement_factory=lambda: self.core.achievement_manager,
+                defer_panels=True
+            )
             
             # Cargar username si existe
-            if "username" in saved_data:
+            if saved_data and "username" in saved_data:
                 self.ui_manager.set_username(saved_data["username"])
+            
+            # Mostrar las tareas del día seleccionado
+            self.ui_manager.refresh_task_list()
+        
+        with self.profile.phase("primer frame"):
+            self.root.update()
+        self.profile.mark("primer frame dibujado")
+        
+        # Nombre y logros tal como están en el snapshot o el journal; save_all_data
+        # solo registra en el journal lo que cambie respecto a esto
+        self._journaled_meta = {
+            "username": (saved_data or {}).get("username"),
+            "achievements": (saved_data or {}).get("achievements", {})
+        }
+        # Cada cambio de tareas ya va al journal; además programa un guardado que
+        # agrupa la ráfaga de cambios (y los logros que desbloquee) en un snapshot
+        self.task_manager.add_listener(self.on_task_change, self.on_tasks_change)
         
         # Mostrar diálogo de nombre SOLO si es la primera ejecución
-        if is_first_run:
+        if not saved_data or "username" not in saved_data:
             self.ui_manager.show_name_dialog()
             self.save_all_data()  # Guardar inmediatamente después de obtener el nombre
         
@@ -52,28 +76,124 @@ class MotivateApp:
         
         # Configurar el callback de guardado
         self.ui_manager.set_save_callback(self.save_all_data)
+        
+        # Lo que no hace falta para el primer frame, en orden y dejando procesar
+        # eventos entre una fase y la siguiente. Los logros van primero para que
+        # estén cargados antes de que se pueda completar una tarea
+        self._deferred = [
+            ("logros", lambda: self.load_achievements(saved_data)),
+            ("panel de estadísticas y calendario", self.ui_manager.setup_deferred_panels),
+            ("colores del calendario", self.ui_manager.update_calendar_colors),
+        ]
+        self.root.after(0, self.run_deferred_phase)
+    
+    def load_achievements(self, saved_data):
+        """Carga los logros guardados y muestra juntos los superados por datos importados o restaurados"""
+        if not saved_data:
+            return
+        backfilled = self.core.load_achievements(saved_data)
+        if backfilled:
+            self.root.after(500, lambda: self.ui_manager.show_achievements_popup(backfilled))
+    
+    def run_deferred_phase(self):
+        """Ejecuta la siguiente fase diferida del arranque"""
+        if not self._deferred:
+            self.profile.mark("arranque completo")
+            if self.show_profile:
+                print("\n".join(self.profile.report()))
+            return
+        name, step = self._deferred.pop(0)
+        with self.profile.phase(name):
+            step()
+        self.root.after(0, self.run_deferred_phase)
     
     def setup_theme(self):
+        import customtkinter as ctk
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
     
-    def save_all_data(self):
+    def save_all_data(self, compact: bool = False):
         """Guarda todos los datos de la aplicación"""
-        data_to_save = {
-            "tasks": [task.to_dict() for task in self.task_manager.tasks],
-            "stats": self.stats_manager.stats,
-            "username": self.ui_manager.username
-        }
-        self.data_manager.save_data(data_to_save)
+        if self.data_manager.journal_mode and not compact:
+            # Las tareas ya están en el journal; solo falta lo que cambió del resto del
+            # estado (las estadísticas se recalculan al cargar si el journal no está vacío)
+            changed = self.changed_meta()
+            if changed:
+                self.data_manager.append_journal({"op": "meta", "data": changed})
+            self.schedule_save()
+            return
+        
+        self.autosaver.request()
+    
+    def changed_meta(self):
+        """Nombre y logros que cambiaron desde el último registro en el journal o snapshot"""
+        changed = {}
+        if self.ui_manager.username != self._journaled_meta["username"]:
+            changed["username"] = self.ui_manager.username
+        state = self.core.achievement_manager.export_state()
+        if state["achievements"] != self._journaled_meta["achievements"]:
+            changed.update(state)
+        self._journaled_meta.update(
+            {key: value for key, value in changed.items() if key in self._journaled_meta})
+        return changed
+    
+    def on_task_change(self, event, task):
+        self.schedule_save()
+    
+    def on_tasks_change(self, changes):
+        self.schedule_save()
+    
+    def schedule_save(self):
+        """Programa un guardado agrupado; si el journal pasa del umbral, guarda ya"""
+        if not self.compact_if_needed():
+            self.autosaver.request()
+    
+    def compact_if_needed(self) -> bool:
+        """Vuelca el journal al snapshot en cuanto pasa del umbral de compactación"""
+        if self.data_manager.needs_compaction() and not self.autosaver.busy():
+            self.autosaver.flush()
+            return True
+        return False
+    
+    def capture_data(self):
+        """Copia del estado en el hilo de Tk, junto con la marca del journal que cubre"""
+        self.core.username = self.ui_manager.username
+        snapshot = self.core.capture_data()
+        # El snapshot ya lleva el nombre y los logros actuales
+        data, _ = snapshot
+        self._journaled_meta = {"username": data.get("username"), "achievements": data.get("achievements", {})}
+        return snapshot
+    
+    def write_data(self, snapshot):
+        """Escribe un snapshot capturado (se ejecuta en el hilo de guardado)"""
+        data_to_save, mark = snapshot
+        self.data_manager.save_data(data_to_save, mark)
     
     def on_closing(self):
         """Método llamado cuando se cierra la aplicación"""
-        self.save_all_data()
+        finished = self.autosaver.close(self.capture_data(), timeout=5.0)
+        if not finished:
+            print("Error al guardar datos: el guardado no terminó a tiempo")
+        else:
+            self.core.close()
         self.root.destroy()
 
     def run(self):
         self.root.mainloop()
 
-if __name__ == "__main__":
-    app = MotivateApp()
+def main():
+    profile = StartupProfile()
+    parser = argparse.ArgumentParser(description="Motívate Diariamente")
+    parser.add_argument("--storage", choices=["json", "sqlite", "binary"], default="json",
+                        help="backend de almacenamiento (por defecto: json)")
+    parser.add_argument("--autosave-delay", type=int, default=1500, metavar="MS",
+                        help="ventana en ms para agrupar guardados (por defecto: 1500)")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="muestra cuánto tarda cada fase del arranque")
+    args = parser.parse_args()
+    app = MotivateApp(storage=args.storage, autosave_delay_ms=args.autosave_delay,
+                      profile=profile, show_profile=args.startup_profile)
     app.run()
+
+if __name__ == "__main__":
+    main()
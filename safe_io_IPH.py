@@ -0,0 +1,60 @@
+import hashlib
+import os
+from typing import Any
+import codec_IPH
+
+CHECKSUM_PREFIX = b"\n#sha256:"  # Pie que se añade al final de cada archivo JSON
+
+class CorruptFileError(ValueError):
+    """El archivo está truncado o su checksum no coincide"""
+
+def fsync_dir(path: str):
+    """Asegura que el renombrado quede en disco (no disponible en Windows)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write(path: str, data: bytes):
+    """Escribe en un temporal, hace fsync y lo renombra sobre el destino.
+
+    Un cierre inesperado deja el archivo anterior o el nuevo, nunca uno a medias.
+    """
+    tmp_file = path + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    fsync_dir(path)
+
+def write_json(path: str, obj: Any, pretty: bool = True):
+    """Guarda `obj` como JSON de forma atómica con un pie de checksum SHA-256"""
+    body = codec_IPH.dumps(obj, pretty=pretty)
+    footer = CHECKSUM_PREFIX + hashlib.sha256(body).hexdigest().encode('ascii') + b"\n"
+    atomic_write(path, body + footer)
+
+def read_json(path: str) -> Any:
+    """Lee un JSON escrito con write_json comprobando su checksum.
+
+    Los archivos sin pie (formato anterior) se aceptan si son JSON válido.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    body = raw
+    footer_at = raw.rfind(CHECKSUM_PREFIX)
+    if footer_at != -1:
+        body = raw[:footer_at]
+        expected = raw[footer_at + len(CHECKSUM_PREFIX):].strip().decode('ascii', 'replace')
+        if hashlib.sha256(body).hexdigest() != expected:
+            raise CorruptFileError(f"checksum incorrecto en {path}")
+    try:
+        return codec_IPH.loads(body)
+    except ValueError as e:
+        raise CorruptFileError(f"{path} está dañado: {e}")
@@ -1,14 +1,24 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 setup(
     name="motivate-diariamente",
     version="1.0.0",
-    packages=find_packages(),
+    # La aplicación son módulos sueltos en la raíz, no un paquete
+    py_modules=[
+        'main_IPH', 'cli_IPH', 'core_IPH', 'ui_manager_IPH', 'task_list_view_IPH',
+        'task_manager_IPH', 'stats_manager_IPH', 'streak_engine_IPH', 'windowed_counters_IPH',
+        'achievement_manager_IPH', 'analytics_IPH', 'data_manager_IPH',
+        'sqlite_data_manager_IPH', 'binary_data_manager_IPH', 'backup_store_IPH',
+        'autosave_IPH', 'safe_io_IPH', 'codec_IPH', 'bulk_io_IPH', 'startup_IPH',
+    ],
     install_requires=[
         'customtkinter',
         'tkcalendar',
         'pillow',
     ],
+    extras_require={
+        'fast': ['orjson'],
+    },
     author="Tu Nombre",
     author_email="tu@email.com",
     description="Una aplicación de gestión de tareas gamificada para mantener la motivación",
@@ -26,7 +36,10 @@ setup(
     python_requires='>=3.8',
     entry_points={
         'console_scripts': [
-            'motivate-diariamente=src.main_IPH:main',
+            'motivate=cli_IPH:main',
+        ],
+        'gui_scripts': [
+            'motivate-diariamente=main_IPH:main',
         ],
     },
     include_package_data=True,
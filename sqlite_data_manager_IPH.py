@@ -0,0 +1,324 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from data_manager_IPH import DataManager, UNDATED_MONTH
+import codec_IPH
+
+TASK_COLUMNS = ("id", "title", "description", "category", "priority",
+                "scheduled_date", "created_at", "completed", "completed_at")
+
+# Estadísticas que van a la tabla daily_stats en lugar de a meta
+DAILY_STATS_KEYS = ("daily_points", "completed_by_date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    category TEXT,
+    priority INTEGER,
+    scheduled_date TEXT,
+    created_at TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_scheduled_date ON tasks(scheduled_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    date TEXT PRIMARY KEY,
+    points INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS achievements (
+    id TEXT PRIMARY KEY,
+    unlocked_at TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class SQLiteDataManager(DataManager):
+    """Backend SQLite (modo WAL) con la misma interfaz que DataManager.
+
+    Cada cambio de tarea se escribe al momento como una fila, así que no hay
+    journal que compactar; los meses se cargan con consultas indexadas por
+    scheduled_date y los backups siguen yendo al mismo BackupStore.
+    """
+
+    def __init__(self, db_file: str = "motivate_diariamente.db",
+                 backup_retention: Optional[Dict[str, int]] = None):
+        super().__init__(journal_mode=True, backup_retention=backup_retention, partitioned=True)
+        self.db_file = db_file
+        is_new = not os.path.exists(self.db_file)
+        # La conexión se comparte con el hilo de guardado automático
+        self.db_lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._next_seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM tasks").fetchone()[0]
+        if is_new:
+            self.migrate_from_json()
+
+    def close(self):
+        with self.db_lock:
+            self.conn.close()
+
+    # --- Interfaz de DataManager ---
+
+    def load_data(self) -> Dict[str, Any]:
+        """Carga meta, estadísticas y solo las tareas del mes actual"""
+        try:
+            with self.db_lock:
+                data = self._load_meta()
+                current_month = datetime.now().strftime("%Y-%m")
+                data["tasks"] = self.load_month(current_month)
+                aggregates = self.query_month_aggregates()
+                months = set(aggregates) | set(self._months_with_tasks())
+
+            aggregates.pop(current_month, None)
+            data["unloaded_months"] = sorted(months - {current_month})
+            data["month_aggregates"] = aggregates
+            return data
+        except sqlite3.Error as e:
+            print(f"Error al cargar datos: {e}")
+            return self.create_empty_data()
+
+    def save_data(self, data: Dict[str, Any], mark: Optional[Dict[str, Any]] = None):
+        try:
+            with self.db_lock, self.conn:
+                self._save_meta(data)
+                # Con marca, el snapshot viene de la app y sus filas ya se escribieron
+                # una a una (y pueden ser más nuevas que el snapshot)
+                if mark is None:
+                    self._save_tasks(data.get("tasks", []), set(data.get("unloaded_months", [])))
+            self.create_backup(self.snapshot())
+        except sqlite3.Error as e:
+            print(f"Error al guardar datos: {e}")
+
+    def append_journal(self, record: Dict[str, Any]):
+        """Los registros "meta" se guardan directamente en la base de datos"""
+        if record.get("op") != "meta":
+            return
+        try:
+            with self.db_lock, self.conn:
+                self._save_meta(record["data"])
+        except sqlite3.Error as e:
+            print(f"Error al guardar datos: {e}")
+
+    def journal_task_change(self, event: str, task):
+        """Escribe el cambio de una tarea en su fila"""
+        try:
+            with self.db_lock, self.conn:
+                if event == "removed":
+                    self.conn.execute("DELETE FROM tasks WHERE id = ?", (task.id,))
+                else:
+                    self._upsert_tasks([task.to_dict()])
+        except sqlite3.Error as e:
+            print(f"Error al guardar tarea: {e}")
+
+    def journal_task_changes(self, changes: List[Tuple[str, Any]]):
+        """Escribe los cambios de una operación en bloque en una sola transacción"""
+        latest = {task.id: (event, task) for event, task in changes}
+        try:
+            with self.db_lock, self.conn:
+                self.conn.executemany("DELETE FROM tasks WHERE id = ?",
+                                      [(task_id,) for task_id, (event, _) in latest.items() if event == "removed"])
+                self._upsert_tasks([task.to_dict() for event, task in latest.values() if event != "removed"])
+        except sqlite3.Error as e:
+            print(f"Error al guardar tareas: {e}")
+
+    def begin_import(self):
+        """Las estadísticas guardadas se invalidan hasta el próximo guardado"""
+        with self.db_lock, self.conn:
+            self._save_stats({})
+
+    def import_batch(self, tasks: List[Dict[str, Any]]):
+        """Escribe las tareas importadas de meses no cargados en una sola transacción"""
+        with self.db_lock, self.conn:
+            self._upsert_tasks(tasks)
+
+    def finish_import(self):
+        # Las filas ya están escritas
+        pass
+
+    def existing_ids(self, tasks: List[Dict[str, Any]]) -> set:
+        """Ids de `tasks` que ya están en la base de datos (búsqueda por la clave primaria)"""
+        ids = [task["id"] for task in tasks]
+        found = set()
+        with self.db_lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                found.update(row[0] for row in self.conn.execute(
+                    f"SELECT id FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        return found
+
+    def needs_compaction(self) -> bool:
+        # SQLite ya persiste cada cambio; no hay nada que volcar
+        return False
+
+    def load_month(self, month: str) -> List[Dict[str, Any]]:
+        """Tareas de un mes mediante un rango sobre el índice de scheduled_date"""
+        if month == UNDATED_MONTH:
+            return self._query_tasks("scheduled_date IS NULL OR scheduled_date = ''")
+        return self._query_tasks("scheduled_date >= ? AND scheduled_date < ?", self._month_range(month))
+
+    # --- Consultas indexadas ---
+
+    def store_queries(self) -> Dict[str, Callable[[Any], List[Dict[str, Any]]]]:
+        # Las consultas por fecha ya leen solo su mes con load_month
+        return {"category": self.query_tasks_by_category, "completed": self.query_tasks_by_status}
+
+    def _query_tasks(self, where: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        with self.db_lock:
+            rows = self.conn.execute(f"SELECT * FROM tasks WHERE {where} ORDER BY seq", params).fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def query_tasks_by_category(self, category: str) -> List[Dict[str, Any]]:
+        return self._query_tasks("category = ?", (category,))
+
+    def query_tasks_by_status(self, completed: bool) -> List[Dict[str, Any]]:
+        return self._query_tasks("completed = ?", (int(completed),))
+
+    def query_month_aggregates(self) -> Dict[str, Dict[str, List[int]]]:
+        """[total, completadas, alta prioridad] por día, agrupados por mes"""
+        with self.db_lock:
+            rows = self.conn.execute(
+                "SELECT scheduled_date, COUNT(*), SUM(completed), SUM(priority >= 4) FROM tasks "
+                "WHERE scheduled_date IS NOT NULL AND scheduled_date != '' GROUP BY scheduled_date").fetchall()
+        aggregates: Dict[str, Dict[str, List[int]]] = {}
+        for date_str, total, completed, high in rows:
+            aggregates.setdefault(date_str[:7], {})[date_str] = [total, completed, high]
+        return aggregates
+
+    def _months_with_tasks(self) -> List[str]:
+        has_undated = self.conn.execute(
+            "SELECT 1 FROM tasks WHERE scheduled_date IS NULL OR scheduled_date = '' LIMIT 1").fetchone()
+        return [UNDATED_MONTH] if has_undated else []
+
+    @staticmethod
+    def _month_range(month: str) -> Tuple[str, str]:
+        year, month_number = int(month[:4]), int(month[5:7])
+        if month_number == 12:
+            return f"{month}-01", f"{year + 1:04d}-01-01"
+        return f"{month}-01", f"{year:04d}-{month_number + 1:02d}-01"
+
+    # --- Conversión entre filas y diccionarios ---
+
+    @staticmethod
+    def _row_to_task(row: sqlite3.Row) -> Dict[str, Any]:
+        task = {column: row[column] for column in TASK_COLUMNS}
+        task["completed"] = bool(task["completed"])
+        return task
+
+    def _upsert_tasks(self, tasks: List[Dict[str, Any]]):
+        rows = []
+        for task in tasks:
+            rows.append((self._next_seq,) + tuple(
+                int(task[column]) if column == "completed" else task.get(column)
+                for column in TASK_COLUMNS))
+            self._next_seq += 1
+        self.conn.executemany(
+            f"INSERT INTO tasks (seq, {', '.join(TASK_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in TASK_COLUMNS)}) "
+            f"ON CONFLICT(id) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in TASK_COLUMNS if column != "id"),
+            rows)
+
+    def _save_tasks(self, tasks: List[Dict[str, Any]], unloaded_months: set):
+        """Guarda las tareas cargadas y borra las que ya no están en los meses cargados"""
+        self._upsert_tasks(tasks)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM keep_ids")
+        self.conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", ((task["id"],) for task in tasks))
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS skip_months (month TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM skip_months")
+        self.conn.executemany("INSERT INTO skip_months VALUES (?)", ((month,) for month in unloaded_months))
+        self.conn.execute(
+            "DELETE FROM tasks WHERE id NOT IN (SELECT id FROM keep_ids) "
+            "AND COALESCE(NULLIF(substr(scheduled_date, 1, 7), ''), ?) NOT IN (SELECT month FROM skip_months)",
+            (UNDATED_MONTH,))
+
+    def _save_meta(self, data: Dict[str, Any]):
+        """Guarda username, estadísticas y logros"""
+        for key, value in data.items():
+            if key in ("tasks", "unloaded_months", "month_aggregates"):
+                continue
+            if key == "stats":
+                self._save_stats(value)
+            elif key == "achievements":
+                self.conn.execute("DELETE FROM achievements")
+                self.conn.executemany("INSERT INTO achievements VALUES (?, ?)", value.items())
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                  (key, codec_IPH.dumps(value).decode('utf-8')))
+
+    def _save_stats(self, stats: Dict[str, Any]):
+        daily = {}
+        for date_str, points in stats.get("daily_points", {}).items():
+            daily.setdefault(date_str, [0, 0])[0] = points
+        for date_str, completed in stats.get("completed_by_date", {}).items():
+            daily.setdefault(date_str, [0, 0])[1] = completed
+        self.conn.execute("DELETE FROM daily_stats")
+        self.conn.executemany("INSERT INTO daily_stats VALUES (?, ?, ?)",
+                              ((date_str, points, completed) for date_str, (points, completed) in daily.items()))
+
+        summary = {key: value for key, value in stats.items() if key not in DAILY_STATS_KEYS}
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('stats', ?)",
+                          (codec_IPH.dumps(summary).decode('utf-8'),))
+
+    def _load_meta(self) -> Dict[str, Any]:
+        data = {key: codec_IPH.loads(value) for key, value in self.conn.execute("SELECT key, value FROM meta")}
+        if "stats" not in data:
+            data["stats"] = self.create_empty_data()["stats"]
+        stats = data["stats"]
+        stats["daily_points"] = {}
+        stats["completed_by_date"] = {}
+        for date_str, points, completed in self.conn.execute("SELECT date, points, completed FROM daily_stats"):
+            stats["daily_points"][date_str] = points
+            stats["completed_by_date"][date_str] = completed
+
+        achievements = dict(self.conn.execute("SELECT id, unlocked_at FROM achievements").fetchall())
+        if achievements:
+            data["achievements"] = achievements
+        return data
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Todos los datos en el formato JSON de siempre (para backups y exportar)"""
+        with self.db_lock:
+            data = self._load_meta()
+            rows = self.conn.execute("SELECT * FROM tasks ORDER BY seq").fetchall()
+        data["tasks"] = [self._row_to_task(row) for row in rows]
+        return data
+
+    # --- Migración ---
+
+    def migrate_from_json(self):
+        """Importa una sola vez los datos JSON existentes (archivo único o particionado)"""
+        json_manager = DataManager(journal_mode=True, partitioned=os.path.exists(
+            os.path.join(self.partition_dir, "index.json")))
+        data = json_manager.load_data()
+        if json_manager.partitioned:
+            for month in data.get("unloaded_months", []):
+                data["tasks"].extend(json_manager.load_month(month))
+            data["unloaded_months"] = []
+
+        # Sin datos principales: partir del backup más reciente
+        if not data.get("tasks"):
+            backups = sorted(json_manager.list_backups())
+            if backups:
+                data = json_manager.restore_backup(backups[-1])
+
+        if data.get("tasks") or "username" in data:
+            with self.db_lock, self.conn:
+                self._save_meta(data)
+                self._save_tasks(data.get("tasks", []), set())
+            json_manager.clear_journal()
+        json_manager.migrate_legacy_backups()
@@ -0,0 +1,30 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+class StartupProfile:
+    """Tiempos de cada fase del arranque, medidos desde que se crea el perfil"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (fase, inicio y duración en segundos); los hitos tienen duración None
+        self.phases: List[Tuple[str, float, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, started - self.started, time.perf_counter() - started))
+
+    def mark(self, name: str) -> None:
+        """Registra un hito (por ejemplo, el primer frame dibujado)"""
+        self.phases.append((name, time.perf_counter() - self.started, None))
+
+    def report(self) -> List[str]:
+        lines = [f"{'Fase':<32} {'inicio':>10} {'duración':>10}"]
+        for name, start, duration in self.phases:
+            took = "" if duration is None else f"{duration * 1000:8.1f} ms"
+            lines.append(f"{name:<32} {start * 1000:7.1f} ms {took:>10}")
+        return lines
@@ -1,18 +1,44 @@
-from datetime import datetime, date
-from typing import Dict, Any, Optional
+from collections import Counter
+from datetime import date
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from streak_engine_IPH import StreakEngine
+from windowed_counters_IPH import PeakCounter, week_of
+
+STATS_VERSION = 5  # Estadísticas derivadas del registro de completadas
+HIGH_PRIORITY = 4
+
+# Una completada: (día, categoría, puntos, prioridad, y hora y día de la semana
+# en que se completó, o None si no se sabe cuándo)
+CompletionEvent = Tuple[str, str, int, int, Optional[int], Optional[int]]
 
 class StatsManager:
     def __init__(self):
+        # Completadas de las tareas cargadas, agrupadas: evento -> nº de tareas.
+        # Las estadísticas son la suma de estos eventos y los de los meses no cargados
+        self.completions: Counter = Counter()
+        # Evento de cada tarea antes de su primer cambio aún no avisado (before_update)
+        self._before: Dict[str, Optional[CompletionEvent]] = {}
+        self._analytics = None  # StatsAnalytics del registro actual, si se pidió
+        self.streaks = StreakEngine()  # Días con completadas, agrupados en rachas
+        # Completadas por día y por semana, con el máximo de cada una
+        self.day_peaks = PeakCounter()
+        self.week_peaks = PeakCounter()
         self._initialize_stats()
 
     def _initialize_stats(self):
         """Inicializa o reinicia las estadísticas con valores por defecto"""
         self.stats: Dict[str, Any] = {
+            "version": STATS_VERSION,
             "total_points": 0,
             "daily_points": {},
             "category_points": {},
             "tasks_completed": 0,
             "tasks_by_category": {},
+            "high_priority_completed": 0,  # Prioridad 4 o 5
+            "completed_by_hour": [0] * 24,  # Según la hora en que se completaron
+            "completed_by_weekday": [0] * 7,  # Según el día en que se completaron (0 = lunes)
+            "peak_daily_completed": 0,  # Máximo de completadas en un día
+            "peak_weekly_completed": 0,  # Máximo de completadas en una semana (lunes a domingo)
             "current_streak": 0,
             "best_streak": 0,
             "last_completion_date": None,
@@ -21,59 +47,205 @@ class StatsManager:
             "last_streak_date": None  # También agregamos este campo que faltaba
         }
 
-    def update_task_completion(self, task) -> None:
-        """Actualiza las estadísticas cuando se completa una tarea"""
-        completion_date = task.scheduled_date or date.today().isoformat()
-        points = self._calculate_task_points(task)
-
-        # Actualizar puntos y contadores básicos
-        self.stats["total_points"] += points
-        self.stats["tasks_completed"] += 1
-        self.stats["total_tasks_completed"] += 1
-
-        # Actualizar puntos por fecha
-        if completion_date not in self.stats["daily_points"]:
-            self.stats["daily_points"][completion_date] = 0
-        self.stats["daily_points"][completion_date] += points
-
-        # Actualizar completadas por fecha
-        if completion_date not in self.stats["completed_by_date"]:
-            self.stats["completed_by_date"][completion_date] = 0
-        self.stats["completed_by_date"][completion_date] += 1
-
-        # Actualizar categorías
-        if task.category not in self.stats["category_points"]:
-            self.stats["category_points"][task.category] = 0
-            self.stats["tasks_by_category"][task.category] = 0
-        self.stats["category_points"][task.category] += points
-        self.stats["tasks_by_category"][task.category] += 1
-
-        # Actualizar racha solo si es un nuevo día
-        today = date.today().isoformat()
-        if self.stats["last_completion_date"] != today:
-            self._update_streak(today)
-
-    def _update_streak(self, completion_date: str) -> None:
-        """Actualiza la racha de tareas completadas"""
-        if not self.stats["last_completion_date"]:
-            # Primera tarea completada
-            self.stats["current_streak"] = 1
-        else:
-            last_date = datetime.strptime(self.stats["last_completion_date"], "%Y-%m-%d").date()
-            current_date = datetime.strptime(completion_date, "%Y-%m-%d").date()
-            days_diff = (current_date - last_date).days
-
-            if days_diff == 1:
-                # Día consecutivo
-                self.stats["current_streak"] += 1
-            elif days_diff == 0:
-                pass  # Mismo día, no afecta la racha
+    def load_stats(self, saved_stats: Dict[str, Any]) -> None:
+        """Toma las estadísticas guardadas (completando los campos que falten)"""
+        stats = self.stats.copy()
+        stats.update(saved_stats)
+        self.stats = stats
+        self.streaks.rebuild(stats["completed_by_date"])
+        self._update_streaks()
+        self._rebuild_windows(stats["completed_by_date"])
+
+    def _rebuild_windows(self, completed_by_date: Dict[str, int]) -> None:
+        """Recalcula los contadores por día y semana a partir de las completadas por fecha"""
+        self.day_peaks.rebuild(completed_by_date.items())
+        self.week_peaks.rebuild((week_of(day), count) for day, count in completed_by_date.items())
+        self.stats["peak_daily_completed"] = self.day_peaks.peak
+        self.stats["peak_weekly_completed"] = self.week_peaks.peak
+
+    def _event_of(self, task) -> Optional[CompletionEvent]:
+        """Evento de completada de una tarea, o None si no está completada"""
+        if not task.completed:
+            return None
+        completion_date = task.scheduled_date or (task.completed_at or date.today().isoformat())[:10]
+        return (completion_date, task.category, self._calculate_task_points(task),
+                task.priority, task.completed_hour(), task.completed_weekday())
+
+    def rebuild(self, tasks: Optional[Iterable] = None) -> None:
+        """Recalcula todas las estadísticas desde cero a partir de las tareas dadas o,
+        sin tareas, de las completadas ya registradas (sin recorrer las tareas)"""
+        if tasks is not None:
+            self.completions = Counter()
+            self.adopt(tasks)
+        self._analytics = None
+
+        # Eventos iguales (mismo día, categoría y puntos) se agregan de una vez
+        daily_points: Counter = Counter()
+        completed_by_date: Counter = Counter()
+        category_points: Counter = Counter()
+        tasks_by_category: Counter = Counter()
+        high_priority = 0
+        by_hour = [0] * 24
+        by_weekday = [0] * 7
+        for (day, category, points, priority, hour, weekday), count in self.completions.items():
+            daily_points[day] += points * count
+            completed_by_date[day] += count
+            category_points[category] += points * count
+            tasks_by_category[category] += count
+            if priority >= HIGH_PRIORITY:
+                high_priority += count
+            if hour is not None:
+                by_hour[hour] += count
+            if weekday is not None:
+                by_weekday[weekday] += count
+
+        total = sum(completed_by_date.values())
+        self.stats.update({
+            "version": STATS_VERSION,
+            "total_points": sum(category_points.values()),
+            "daily_points": dict(daily_points),
+            "completed_by_date": dict(completed_by_date),
+            "category_points": dict(category_points),
+            "tasks_by_category": dict(tasks_by_category),
+            "high_priority_completed": high_priority,
+            "completed_by_hour": by_hour,
+            "completed_by_weekday": by_weekday,
+            "tasks_completed": total,
+            "total_tasks_completed": total
+        })
+        self.streaks.rebuild(completed_by_date)
+        self._update_streaks()
+        self._rebuild_windows(completed_by_date)
+
+    def adopt(self, tasks: Iterable) -> None:
+        """Registra tareas cargadas cuyas completadas ya están en las estadísticas guardadas"""
+        self.completions.update(event for event in map(self._event_of, tasks) if event)
+        self._analytics = None
+
+    def before_update(self, task) -> None:
+        """Listener de TaskManager (add_update_listener): guarda el evento de la tarea
+        antes de que cambien sus campos, para restarlo al recibir el aviso"""
+        if task.id not in self._before:
+            self._before[task.id] = self._event_of(task)
+
+    def _old_event(self, event: str, task) -> Optional[CompletionEvent]:
+        """Evento de la tarea antes del primer cambio de un aviso"""
+        if event == "added":
+            self._before.pop(task.id, None)
+            return None
+        if task.id in self._before:
+            return self._before.pop(task.id)
+        # Eliminada sin cambios previos: su evento no ha cambiado
+        return self._event_of(task)
+
+    def on_task_change(self, event: str, task) -> None:
+        """Listener de TaskManager: aplica el cambio de una tarea (incluido deshacer)"""
+        old_event = self._old_event(event, task)
+        new_event = None if event == "removed" else self._event_of(task)
+        deltas: Counter = Counter()
+        deltas[old_event] -= 1
+        deltas[new_event] += 1
+        self._fold(deltas)
+
+    def on_tasks_change(self, changes: List[Tuple[str, Any]]) -> None:
+        """Listener por lotes: agrupa los eventos iguales y los aplica de una vez"""
+        # Por tarea cuenta su estado antes del primer cambio y después del último
+        old_events: Dict[str, Optional[CompletionEvent]] = {}
+        last: Dict[str, Tuple[str, Any]] = {}
+        for event, task in changes:
+            if task.id not in old_events:
+                old_events[task.id] = self._old_event(event, task)
+            last[task.id] = (event, task)
+        event_of = self._event_of
+        deltas: Counter = Counter()
+        for task_id, (event, task) in last.items():
+            deltas[old_events[task_id]] -= 1
+            deltas[None if event == "removed" else event_of(task)] += 1
+        self._fold(deltas)
+
+    def _fold(self, deltas: Counter) -> None:
+        """Aplica los cambios de las tareas cargadas a sus completadas y a las estadísticas"""
+        deltas.pop(None, None)
+        for event, count in deltas.items():
+            if count:
+                value = self.completions[event] + count
+                if value:
+                    self.completions[event] = value
+                else:
+                    del self.completions[event]
+        self._apply_deltas(deltas)
+
+    def add_unloaded(self, tasks: Iterable) -> None:
+        """Suma las completadas de tareas que se guardan sin cargarse (importación en bloque).
+
+        Como las de los meses no cargados, no se registran en `completions`:
+        adopt las registra cuando se carga su mes.
+        """
+        self._apply_deltas(Counter(event for event in map(self._event_of, tasks) if event))
+
+    def _apply_deltas(self, deltas: Counter) -> None:
+        """Aplica de una vez las sumas y restas de cada evento"""
+        if not any(deltas.values()):
+            return
+        self._analytics = None
+        days_changed = False
+        # Primero las sumas: un día cuyas completadas solo cambian de evento no pasa por cero
+        for event, count in sorted(deltas.items(), key=lambda item: -item[1]):
+            if count and self._apply(event, count):
+                if event[0] in self.stats["completed_by_date"]:
+                    self.streaks.add_day(event[0])
+                else:
+                    self.streaks.remove_day(event[0])
+                days_changed = True
+        if days_changed:
+            self._update_streaks()
+
+    def _apply(self, event: CompletionEvent, count: int) -> bool:
+        """Suma (count > 0) o resta (count < 0) un evento `count` veces; devuelve
+        True si su día pasó a tener o dejó de tener completadas"""
+        day, category, points, priority, hour, weekday = event
+        day_was_active = day in self.stats["completed_by_date"]
+        stats = self.stats
+        stats["total_points"] += count * points
+        stats["tasks_completed"] += count
+        stats["total_tasks_completed"] += count
+        if priority >= HIGH_PRIORITY:
+            stats["high_priority_completed"] += count
+        if hour is not None:
+            stats["completed_by_hour"][hour] += count
+        if weekday is not None:
+            stats["completed_by_weekday"][weekday] += count
+        self.day_peaks.add(day, count)
+        self.week_peaks.add(week_of(day), count)
+        stats["peak_daily_completed"] = self.day_peaks.peak
+        stats["peak_weekly_completed"] = self.week_peaks.peak
+        for key, bucket, amount in (("daily_points", day, points), ("completed_by_date", day, 1),
+                                    ("category_points", category, points),
+                                    ("tasks_by_category", category, 1)):
+            counts = stats[key]
+            value = counts.get(bucket, 0) + count * amount
+            if value:
+                counts[bucket] = value
             else:
-                self.stats["current_streak"] = 1
+                counts.pop(bucket, None)
+        return day_was_active != (day in stats["completed_by_date"])
+
+    def _update_streaks(self) -> None:
+        """Copia en las estadísticas la racha actual (termina hoy o ayer) y la mejor racha"""
+        self.stats["current_streak"] = self.streaks.current()
+        self.stats["best_streak"] = self.streaks.best()
+        self.stats["last_completion_date"] = self.streaks.last_day()
 
-        self.stats["last_completion_date"] = completion_date
-        if self.stats["current_streak"] > self.stats["best_streak"]:
-            self.stats["best_streak"] = self.stats["current_streak"]
+    def get_analytics(self):
+        """Análisis con NumPy del registro de completadas (se reutiliza mientras no cambie)"""
+        if self._analytics is None:
+            from analytics_IPH import StatsAnalytics
+            self._analytics = StatsAnalytics(self.completions.elements())
+        return self._analytics
+
+    def update_task_completion(self, task) -> None:
+        """Actualiza las estadísticas cuando se completa una tarea"""
+        self._fold(Counter([self._event_of(task)]))
 
     def _calculate_task_points(self, task) -> int:
         """Calcula los puntos para una tarea basado en sus características"""
@@ -84,36 +256,12 @@ class StatsManager:
 
     def remove_task_points(self, task) -> None:
         """Elimina los puntos asociados a una tarea"""
-        if not task.completed:
-            return
-
-        points = self._calculate_task_points(task)
-        completion_date = task.scheduled_date or task.completed_at.split('T')[0]
-
-        # Actualizar contadores generales
-        self.stats["total_points"] = max(0, self.stats["total_points"] - points)
-        self.stats["tasks_completed"] = max(0, self.stats["tasks_completed"] - 1)
-        self.stats["total_tasks_completed"] = max(0, self.stats["total_tasks_completed"] - 1)
-
-        # Actualizar puntos por fecha
-        if completion_date in self.stats["daily_points"]:
-            self.stats["daily_points"][completion_date] = max(0, 
-                self.stats["daily_points"][completion_date] - points)
-
-        # Actualizar completadas por fecha
-        if completion_date in self.stats["completed_by_date"]:
-            self.stats["completed_by_date"][completion_date] = max(0,
-                self.stats["completed_by_date"][completion_date] - 1)
-
-        # Actualizar categorías
-        if task.category in self.stats["category_points"]:
-            self.stats["category_points"][task.category] = max(0,
-                self.stats["category_points"][task.category] - points)
-            self.stats["tasks_by_category"][task.category] = max(0,
-                self.stats["tasks_by_category"][task.category] - 1)
+        self._fold(Counter({self._event_of(task): -1}))
 
     def get_stats(self) -> Dict[str, Any]:
         """Retorna las estadísticas actuales"""
+        # La racha actual depende del día de hoy: se refresca por si cambió la fecha
+        self.stats["current_streak"] = self.streaks.current()
         return self.stats
 
     def get_tasks_completed_for_date(self, date_str: str) -> int:
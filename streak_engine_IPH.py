@@ -0,0 +1,172 @@
+import heapq
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+class StreakEngine:
+    """Rachas sobre el conjunto ordenado de días con completadas.
+
+    Los días activos se guardan como tramos de días consecutivos (inicio ->
+    fin, en ordinales). Los inicios se marcan en un árbol de Fenwick sobre el
+    rango de ordinales, así buscar el tramo de un día, añadirlo o quitarlo es
+    O(log n). Añadir o quitar un día toca como mucho dos tramos, la mejor racha
+    sale de un heap de longitudes y la racha actual del tramo que termina hoy o ayer.
+    """
+
+    def __init__(self, days: Iterable[str] = ()):
+        self.rebuild(days)
+
+    def rebuild(self, days: Iterable[str]) -> None:
+        """Reconstruye los tramos a partir de los días activos ("YYYY-MM-DD")"""
+        self._day_counts: Dict[int, int] = {}
+        for day in days:
+            ordinal = date.fromisoformat(day).toordinal()
+            self._day_counts[ordinal] = self._day_counts.get(ordinal, 0) + 1
+
+        # Árbol de Fenwick (desde 1) con un 1 en cada inicio de tramo; la
+        # posición i corresponde al ordinal _base + i - 1
+        self._base = 0
+        self._tree: List[int] = [0]
+        self._end_of: Dict[int, int] = {}    # inicio -> fin
+        self._start_of: Dict[int, int] = {}  # fin -> inicio
+        self._lengths: Dict[int, int] = {}   # longitud -> nº de tramos
+        self._heap: List[int] = []           # longitudes en negativo, con borrado perezoso
+        ordinals = sorted(self._day_counts)
+        if ordinals:
+            self._fit(ordinals[0], ordinals[-1])
+        start = previous = None
+        for ordinal in ordinals:
+            if previous is not None and ordinal == previous + 1:
+                previous = ordinal
+                continue
+            if start is not None:
+                self._add_run(start, previous)
+            start = previous = ordinal
+        if start is not None:
+            self._add_run(start, previous)
+
+    def _fit(self, low: int, high: int) -> None:
+        """Amplía el árbol (al doble como mínimo) para que cubra los ordinales low..high"""
+        size = len(self._tree) - 1
+        if size and self._base <= low and high < self._base + size:
+            return
+        if size:
+            low, high = min(low, self._base), max(high, self._base + size - 1)
+        span = high - low + 1
+        size = 1 << (2 * span - 1).bit_length()
+        self._base = low - (size - span) // 2
+        self._tree = [0] * (size + 1)
+        for start in self._end_of:
+            self._tree[start - self._base + 1] = 1
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                self._tree[parent] += self._tree[i]
+
+    def _mark(self, start: int, delta: int) -> None:
+        self._fit(start, start)
+        i, size = start - self._base + 1, len(self._tree) - 1
+        while i <= size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _last_start_up_to(self, ordinal: int) -> Optional[int]:
+        """Mayor inicio de tramo <= ordinal: cuenta los inicios y baja por el árbol hasta el último"""
+        size = len(self._tree) - 1
+        i, rank = min(ordinal - self._base + 1, size), 0
+        while i > 0:
+            rank += self._tree[i]
+            i -= i & -i
+        if not rank:
+            return None
+        position, step = 0, size
+        while step:
+            if self._tree[position + step] < rank:
+                position += step
+                rank -= self._tree[position]
+            step //= 2
+        return self._base + position
+
+    def _add_run(self, start: int, end: int) -> None:
+        self._mark(start, 1)
+        self._end_of[start] = end
+        self._start_of[end] = start
+        length = end - start + 1
+        self._lengths[length] = self._lengths.get(length, 0) + 1
+        heapq.heappush(self._heap, -length)
+        if len(self._heap) > 2 * len(self._end_of) + 64:
+            # Demasiadas longitudes obsoletas: se rehace el heap con las vigentes
+            self._heap = [-length for length, count in self._lengths.items() for _ in range(count)]
+            heapq.heapify(self._heap)
+
+    def _remove_run(self, start: int) -> None:
+        end = self._end_of.pop(start)
+        del self._start_of[end]
+        self._mark(start, -1)
+        length = end - start + 1
+        self._lengths[length] -= 1
+        if not self._lengths[length]:
+            del self._lengths[length]
+        # La mejor racha se lee en O(1): se limpia la cima del heap aquí
+        while self._heap and -self._heap[0] not in self._lengths:
+            heapq.heappop(self._heap)
+
+    def _run_containing(self, ordinal: int) -> Optional[int]:
+        start = self._last_start_up_to(ordinal)
+        if start is not None and self._end_of[start] >= ordinal:
+            return start
+        return None
+
+    def add_day(self, day: str) -> None:
+        """Suma una completada en ese día; une tramos si el día pasa a estar activo"""
+        ordinal = date.fromisoformat(day).toordinal()
+        count = self._day_counts.get(ordinal, 0)
+        self._day_counts[ordinal] = count + 1
+        if count:
+            return
+        start, end = ordinal, ordinal
+        if ordinal - 1 in self._start_of:
+            start = self._start_of[ordinal - 1]
+            self._remove_run(start)
+        if ordinal + 1 in self._end_of:
+            end = self._end_of[ordinal + 1]
+            self._remove_run(ordinal + 1)
+        self._add_run(start, end)
+
+    def remove_day(self, day: str) -> None:
+        """Resta una completada de ese día; parte su tramo si el día queda inactivo"""
+        ordinal = date.fromisoformat(day).toordinal()
+        count = self._day_counts.get(ordinal, 0)
+        if count > 1:
+            self._day_counts[ordinal] = count - 1
+            return
+        if not count:
+            return
+        del self._day_counts[ordinal]
+        start = self._run_containing(ordinal)
+        end = self._end_of[start]
+        self._remove_run(start)
+        if start < ordinal:
+            self._add_run(start, ordinal - 1)
+        if ordinal < end:
+            self._add_run(ordinal + 1, end)
+
+    def best(self) -> int:
+        return -self._heap[0] if self._heap else 0
+
+    def current(self, today: Optional[date] = None) -> int:
+        """Días seguidos con completadas que terminan hoy (o ayer, si hoy aún no hay ninguna)"""
+        today = (today or date.today()).toordinal()
+        for ordinal in (today, today - 1):
+            start = self._start_of.get(ordinal)
+            if start is None and ordinal in self._day_counts:
+                # El tramo sigue después (completadas con fecha futura)
+                start = self._run_containing(ordinal)
+            if start is not None:
+                return ordinal - start + 1
+        return 0
+
+    def last_day(self) -> Optional[str]:
+        if not self._end_of:
+            return None
+        start = self._last_start_up_to(self._base + len(self._tree) - 2)
+        return date.fromordinal(self._end_of[start]).isoformat()
@@ -0,0 +1,263 @@
+import customtkinter as ctk
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROW_HEIGHT = 84  # Alto fijo de cada fila (incluye el margen entre filas)
+ROW_PADDING = 5
+
+class TaskRow:
+    """Fila reutilizable de la lista de tareas.
+
+    Los widgets se crean una sola vez; `bind` solo reconfigura los textos,
+    colores y botones cuando cambia la tarea mostrada.
+    """
+
+    def __init__(self, parent, on_complete: Callable[[str], None],
+                 on_edit: Callable[[object], None], on_delete: Callable[[str], None],
+                 on_select: Optional[Callable[[str, bool], None]] = None):
+        self.task = None
+        self._state: Optional[Tuple] = None
+
+        self.frame = ctk.CTkFrame(parent)
+
+        # Casilla para las acciones sobre varias tareas
+        self.selected_var = ctk.BooleanVar(value=False)
+        if on_select:
+            self.select_box = ctk.CTkCheckBox(
+                self.frame, text="", width=24, variable=self.selected_var,
+                command=lambda: on_select(self.task.id, self.selected_var.get())
+            )
+            self.select_box.pack(side="left", padx=(5, 0))
+
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(side="left", fill="x", expand=True, padx=5)
+
+        self.title_label = ctk.CTkLabel(info_frame, text="", font=("Segoe UI", 12, "bold"), anchor="w")
+        self.title_label.pack(anchor="w")
+
+        self.desc_label = ctk.CTkLabel(info_frame, text="", font=("Segoe UI", 10), anchor="w")
+        self.desc_label.pack(anchor="w")
+
+        self.meta_label = ctk.CTkLabel(info_frame, text="", font=("Segoe UI", 10), anchor="w")
+        self.meta_label.pack(anchor="w")
+
+        button_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        button_frame.pack(side="right", padx=5)
+
+        # Los comandos leen self.task al pulsar, así la fila se puede reasignar
+        self.complete_btn = ctk.CTkButton(
+            button_frame, text="✓", width=30, height=30, font=("Segoe UI", 14),
+            command=lambda: on_complete(self.task.id)
+        )
+        self.edit_btn = ctk.CTkButton(
+            button_frame, text="✎", width=30, height=30, font=("Segoe UI", 14),
+            command=lambda: on_edit(self.task)
+        )
+        self.delete_btn = ctk.CTkButton(
+            button_frame, text="🗑", width=30, height=30, font=("Segoe UI", 13),
+            command=lambda: on_delete(self.task.id)
+        )
+        self.complete_btn.pack(side="left", padx=2)
+        self.edit_btn.pack(side="left", padx=2)
+        self.delete_btn.pack(side="left", padx=2)
+        self._actions_visible = True
+
+    def bind(self, task, colors: Dict[str, str], selected: bool = False):
+        """Muestra la tarea en esta fila, tocando solo lo que haya cambiado"""
+        self.task = task
+        state = (task.id, task.title, task.description, task.category,
+                 task.priority, task.completed, tuple(colors.values()), selected)
+        if state == self._state:
+            return
+        previous = self._state
+        self._state = state
+        if previous is None or previous[7] != selected:
+            self.selected_var.set(selected)
+
+        if previous is None or previous[6] != state[6] or previous[5] != task.completed:
+            self.frame.configure(fg_color=colors["secondary_bg"] if task.completed else colors["bg_color"])
+            for label in (self.title_label, self.desc_label, self.meta_label):
+                label.configure(text_color=colors["fg_color"])
+            self.complete_btn.configure(fg_color=colors["success_color"], hover_color=colors["success_color"])
+            self.edit_btn.configure(fg_color=colors["accent_color"], hover_color=colors["accent_color"])
+            self.delete_btn.configure(fg_color=colors["danger_color"], hover_color=colors["danger_color"])
+
+        self.title_label.configure(text=task.title)
+        self.desc_label.configure(text=task.description or "")
+        self.meta_label.configure(text=f"📋 {task.category} | {'⭐' * task.priority}")
+
+        # Las tareas completadas solo se pueden eliminar
+        if task.completed and self._actions_visible:
+            self.complete_btn.pack_forget()
+            self.edit_btn.pack_forget()
+            self._actions_visible = False
+        elif not task.completed and not self._actions_visible:
+            self.complete_btn.pack(side="left", padx=2, before=self.delete_btn)
+            self.edit_btn.pack(side="left", padx=2, before=self.delete_btn)
+            self._actions_visible = True
+
+    def show(self, slot: int):
+        self.frame.place(x=ROW_PADDING * 2, y=slot * ROW_HEIGHT + ROW_PADDING,
+                         relwidth=1.0, width=-ROW_PADDING * 4, height=ROW_HEIGHT - ROW_PADDING)
+
+    def hide(self):
+        self.frame.place_forget()
+        self.task = None
+
+
+class VirtualTaskList(ctk.CTkFrame):
+    """Lista de tareas virtualizada.
+
+    Solo existen widgets para las filas que caben en pantalla; al desplazarse
+    se reutiliza el mismo conjunto de filas asignándoles otras tareas.
+    """
+
+    def __init__(self, master, row_factory: Callable[[object], TaskRow],
+                 sort_key: Callable[[Any], Any] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_factory = row_factory
+        self.sort_key = sort_key
+        self.items: List = []
+        # Clave de orden de cada elemento, desempatada por orden de llegada para que
+        # sea única: con id -> clave se encuentra su posición por bisección
+        self._keys: List[Tuple[Any, int]] = []
+        self._key_of: Dict[str, Tuple[Any, int]] = {}
+        self._next_seq = 0
+        self.colors: Dict[str, str] = {}
+        self.rows: List[TaskRow] = []
+        self.offset = 0
+        # Ids seleccionados (dict como conjunto ordenado), se conservan al desplazarse
+        self.selected: Dict[str, None] = {}
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", lambda event: self._render())
+        self.bind("<Enter>", self._bind_mousewheel)
+        self.bind("<Leave>", self._unbind_mousewheel)
+
+    def set_items(self, items: List, colors: Dict[str, str]):
+        """Reemplaza las tareas mostradas y vuelve a asignar las filas visibles"""
+        if self.sort_key:
+            items = sorted(items, key=self.sort_key)
+            self._keys = [(self.sort_key(item), seq) for seq, item in enumerate(items)]
+        else:
+            self._keys = [(None, seq) for seq in range(len(items))]
+        self._key_of = {item.id: key for item, key in zip(items, self._keys)}
+        self._next_seq = len(items)
+        self.items = items
+        self.colors = colors
+        shown = {item.id for item in items}
+        self.selected = {item_id: None for item_id in self.selected if item_id in shown}
+        self.offset = max(0, min(self.offset, len(items) - self._visible_count() + 1))
+        self._render()
+
+    def upsert_item(self, item):
+        """Inserta o recoloca un elemento manteniendo el orden, sin reconstruir la lista"""
+        self._detach(item)
+        # Tras los de su misma clave, como si llegara el último
+        key = (self.sort_key(item) if self.sort_key else None, self._next_seq)
+        self._next_seq += 1
+        index = bisect_right(self._keys, key)
+        self.items.insert(index, item)
+        self._keys.insert(index, key)
+        self._key_of[item.id] = key
+        self._render()
+
+    def remove_item(self, item):
+        """Quita un elemento si se está mostrando"""
+        self.selected.pop(item.id, None)
+        if self._detach(item):
+            self._render()
+
+    def set_selected(self, item_id: str, selected: bool):
+        if selected:
+            self.selected[item_id] = None
+        else:
+            self.selected.pop(item_id, None)
+
+    def select_all(self):
+        self.selected = {item.id: None for item in self.items}
+        self._render()
+
+    def clear_selection(self):
+        if self.selected:
+            self.selected = {}
+            self._render()
+
+    def selected_ids(self) -> List[str]:
+        return list(self.selected)
+
+    def _detach(self, item) -> bool:
+        key = self._key_of.pop(item.id, None)
+        if key is None:
+            return False
+        index = bisect_left(self._keys, key)
+        del self.items[index]
+        del self._keys[index]
+        return True
+
+    def _visible_count(self) -> int:
+        return max(1, self.body.winfo_height() // ROW_HEIGHT + 1)
+
+    def _render(self):
+        visible = self._visible_count()
+        while len(self.rows) < visible:
+            self.rows.append(self.row_factory(self.body))
+
+        for slot, row in enumerate(self.rows):
+            index = self.offset + slot
+            if slot < visible and index < len(self.items):
+                item = self.items[index]
+                row.bind(item, self.colors, item.id in self.selected)
+                row.show(slot)
+            elif row.task is not None:
+                row.hide()
+
+        if self.items:
+            first = self.offset / len(self.items)
+            last = min(1.0, (self.offset + visible - 1) / len(self.items))
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset: int):
+        max_offset = max(0, len(self.items) - self._visible_count() + 1)
+        offset = max(0, min(offset, max_offset))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * len(self.items)))
+        elif action == "scroll":
+            step = self._visible_count() - 1 if unit == "pages" else 1
+            self.scroll_to(self.offset + int(value) * max(1, step))
+
+    def _on_mousewheel(self, event):
+        if getattr(event, "num", None) == 4:
+            direction = -1
+        elif getattr(event, "num", None) == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self.scroll_to(self.offset + direction)
+
+    def _bind_mousewheel(self, event=None):
+        self.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.bind_all("<Button-4>", self._on_mousewheel)
+        self.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event=None):
+        # <Leave> también llega al pasar sobre una fila hija: ignorarlo en ese caso
+        x, y = self.winfo_pointerxy()
+        hovered = self.winfo_containing(x, y)
+        if hovered is not None and str(hovered).startswith(str(self)):
+            return
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
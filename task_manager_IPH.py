@@ -1,20 +1,108 @@
-from datetime import datetime
-from typing import List, Dict, Optional
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Dict, Optional, Tuple, Union
+import sys
 import uuid
 
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_HOUR = 3600 * 1000000
+_MICROSECONDS_PER_DAY = 24 * _MICROSECONDS_PER_HOUR
+
+def _pack_timestamp(value: Optional[str]) -> Union[int, str, None]:
+    """Convierte un timestamp ISO a microsegundos enteros si se puede recuperar igual"""
+    if not value:
+        return value
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        # Formatos que isoformat() no reproduciría tal cual se guardan como texto
+        return value
+    return (moment - _EPOCH) // _MICROSECOND
+
+def _unpack_timestamp(value: Union[int, str, None]) -> Optional[str]:
+    if isinstance(value, int):
+        return (_EPOCH + value * _MICROSECOND).isoformat()
+    return value
+
+# Categorías del formulario de tareas
+CATEGORIES = ("Personal", "Trabajo", "Estudio", "Salud", "Ejercicio", "Hogar", "Proyectos", "Otros")
+
 class Task:
+    # Sin __dict__ por instancia: los historiales largos tienen miles de tareas
+    __slots__ = ('id', 'title', 'description', 'category', 'priority', 'completed',
+                 'scheduled_date', '_created_at', '_completed_at')
+
     def __init__(self, title: str, description: str, category: str, priority: int, 
                  scheduled_date: str = None, id: str = None, created_at: str = None, 
                  completed: bool = False, completed_at: str = None):
         self.id = id if id else str(uuid.uuid4())
         self.title = title
         self.description = description
-        self.category = category
-        self.priority = priority
+        # Categorías y fechas se repiten en muchas tareas: compartir una sola cadena
+        self.category = sys.intern(category) if isinstance(category, str) else category
+        self.priority = int(priority)
         self.completed = completed
         self.created_at = created_at if created_at else datetime.now().isoformat()
         self.completed_at = completed_at
-        self.scheduled_date = scheduled_date
+        self.scheduled_date = sys.intern(scheduled_date) if isinstance(scheduled_date, str) else scheduled_date
+
+    @property
+    def created_at(self) -> Optional[str]:
+        return _unpack_timestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value: Optional[str]):
+        self._created_at = _pack_timestamp(value)
+
+    @property
+    def completed_at(self) -> Optional[str]:
+        return _unpack_timestamp(self._completed_at)
+
+    @completed_at.setter
+    def completed_at(self, value: Optional[str]):
+        self._completed_at = _pack_timestamp(value)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Task':
+        """Crea una tarea guardada asignando los campos directamente, sin pasar por __init__"""
+        task = cls.__new__(cls)
+        task.id = data.get('id') or str(uuid.uuid4())
+        task.title = data['title']
+        task.description = data.get('description')
+        category = data.get('category')
+        task.category = sys.intern(category) if isinstance(category, str) else category
+        task.priority = int(data.get('priority', 1))
+        task.completed = data.get('completed', False)
+        task._created_at = _pack_timestamp(data.get('created_at') or datetime.now().isoformat())
+        task._completed_at = _pack_timestamp(data.get('completed_at'))
+        scheduled_date = data.get('scheduled_date')
+        task.scheduled_date = sys.intern(scheduled_date) if isinstance(scheduled_date, str) else scheduled_date
+        return task
+
+    def completed_hour(self) -> Optional[int]:
+        """Hora (0-23) en que se completó, sin reconstruir el timestamp"""
+        value = self._completed_at
+        if isinstance(value, int):
+            return value // _MICROSECONDS_PER_HOUR % 24
+        if value and len(value) >= 13 and value[11:13].isdigit():
+            return int(value[11:13])
+        return None
+
+    def completed_weekday(self) -> Optional[int]:
+        """Día de la semana (0 = lunes) en que se completó"""
+        value = self._completed_at
+        if isinstance(value, int):
+            # 1970-01-01 fue jueves
+            return (value // _MICROSECONDS_PER_DAY + 3) % 7
+        try:
+            return date.fromisoformat(value[:10]).weekday() if value else None
+        except ValueError:
+            return None
 
     def complete(self):
         """Marca la tarea como completada"""
@@ -35,95 +123,493 @@ class Task:
             'completed_at': self.completed_at
         }
 
+# Un cambio deshacible: ("add", tarea, hueco), ("remove", tarea, hueco)
+# o ("update", tarea, campos_antes, campos_después). El hueco es la posición
+# de la tarea en TaskManager._slots, que no cambia al borrar otras tareas
+Change = Tuple[Any, ...]
+
+# Huecos libres a partir de los que se compacta la lista (además de la mitad de su tamaño)
+COMPACT_MIN_HOLES = 64
+
 class TaskManager:
-    def __init__(self):
-        self.tasks: List[Task] = []
-        self.undo_stack: List[List[Task]] = []
-        self.redo_stack: List[List[Task]] = []
+    def __init__(self, max_undo: int = 100):
+        # Orden de las tareas: borrar deja un hueco (None) en lugar de desplazar
+        # el resto, así borrar y deshacer un borrado no dependen del número de tareas
+        self._slots: List[Optional[Task]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._holes = 0
+        self._kept_holes = 0  # Huecos que la última compactación conservó para deshacer
+        # Índice id -> Task, mantenido junto a la lista ordenada
+        self._tasks_by_id: Dict[str, Task] = {}
+        # Índices secundarios (dict como conjunto ordenado de ids)
+        self._ids_by_date: Dict[str, Dict[str, None]] = {}
+        self._ids_by_category: Dict[str, Dict[str, None]] = {}
+        self._completed_ids: Dict[str, None] = {}
+        self._pending_ids: Dict[str, None] = {}
+        # Agregados por día [total, completadas, alta prioridad], agrupados por mes "YYYY-MM"
+        self._day_stats: Dict[str, Dict[str, List[int]]] = {}
+        # Carga perezosa: meses guardados que todavía no están en memoria
+        self.month_loader: Optional[Callable[[str], List[Dict]]] = None
+        self._unloaded_months = set()
+        # Consultas del almacenamiento para filtrar meses no cargados sin cargarlos
+        self.store_queries: Dict[str, Callable[[Any], List[Dict]]] = {}
+        # Cada entrada guarda solo los cambios de una acción, no copias de la lista
+        self.undo_stack: Deque[List[Change]] = deque(maxlen=max_undo)
+        self.redo_stack: List[List[Change]] = []
+        self.listeners: List[Callable[[str, Optional[Task]], None]] = []
+        # Versión por lotes de cada listener (o None): recibe [(evento, tarea), ...]
+        self.batch_listeners: List[Optional[Callable[[List[Tuple[str, Task]]], None]]] = []
+        self.load_listeners: List[Callable[[List[Task]], None]] = []
+        self.update_listeners: List[Callable[[Task], None]] = []
+        # Dentro de batch(): cambios deshacibles y avisos pendientes del bloque
+        self._batch_changes: Optional[List[Change]] = None
+        self._pending_events: Optional[List[Tuple[str, Task]]] = None
+
+    @property
+    def tasks(self) -> List[Task]:
+        """Tareas cargadas, en orden"""
+        if not self._holes:
+            return self._slots
+        return [task for task in self._slots if task is not None]
+
+    def add_listener(self, callback: Callable[[str, Optional[Task]], None],
+                     batch_callback: Optional[Callable[[List[Tuple[str, Task]]], None]] = None) -> None:
+        """Registra un callback que recibe cada cambio ("added", "updated", "removed").
+
+        Si se da `batch_callback`, las operaciones en bloque lo llaman una sola
+        vez con todos sus cambios en lugar de llamar a `callback` por tarea.
+        """
+        self.listeners.append(callback)
+        self.batch_listeners.append(batch_callback)
+
+    def add_load_listener(self, callback: Callable[[List[Task]], None]) -> None:
+        """Registra un callback que recibe las tareas de cada mes cargado bajo demanda"""
+        self.load_listeners.append(callback)
+
+    def add_update_listener(self, callback: Callable[[Task], None]) -> None:
+        """Registra un callback que recibe cada tarea justo antes de cambiar sus campos"""
+        self.update_listeners.append(callback)
+
+    def _notify(self, event: str, task: Optional[Task] = None) -> None:
+        """Avisa a los listeners de un cambio en las tareas"""
+        if self._pending_events is not None:
+            self._pending_events.append((event, task))
+            return
+        for callback in self.listeners:
+            callback(event, task)
+
+    def _notify_batch(self, changes: List[Tuple[str, Task]]) -> None:
+        """Avisa de los cambios de una operación en bloque"""
+        if not changes:
+            return
+        for callback, batch_callback in zip(self.listeners, self.batch_listeners):
+            if batch_callback:
+                batch_callback(changes)
+            else:
+                for event, task in changes:
+                    callback(event, task)
+
+    @contextmanager
+    def _collect_notifications(self) -> Iterator[None]:
+        """Acumula los avisos del bloque y los entrega con un solo _notify_batch"""
+        if self._pending_events is not None:
+            yield
+            return
+        self._pending_events = []
+        try:
+            yield
+        finally:
+            events, self._pending_events = self._pending_events, None
+            self._notify_batch(events)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Agrupa las operaciones del bloque en un solo paso de deshacer y un solo aviso.
+
+        Dentro del bloque se pueden usar add_task, complete_task, edit_task y
+        delete_task; un batch() anidado se une al exterior.
+        """
+        if self._batch_changes is not None:
+            yield
+            return
+        self._batch_changes = []
+        try:
+            with self._collect_notifications():
+                yield
+        finally:
+            changes, self._batch_changes = self._batch_changes, None
+            self._record(changes)
+
+    def load_tasks(self, tasks_data: List[Dict]) -> List[Task]:
+        """Carga tareas guardadas sin registrar pasos de deshacer"""
+        loaded = []
+        for task_data in tasks_data:
+            task = Task.from_dict(task_data)
+            self._slot_of[task.id] = len(self._slots)
+            self._slots.append(task)
+            self._index_task(task)
+            loaded.append(task)
+        return loaded
+
+    def import_tasks(self, tasks_data: List[Dict]) -> List[Task]:
+        """Añade tareas importadas sin registrar pasos de deshacer, avisando a los listeners"""
+        imported = self.load_tasks(tasks_data)
+        self._notify_batch([("added", task) for task in imported])
+        return imported
+
+    def set_store_queries(self, queries: Dict[str, Callable[[Any], List[Dict]]]) -> None:
+        """Consultas indexadas del almacenamiento sobre toda la historia ("category",
+        "completed"); con ellas no hace falta cargar todos los meses para filtrar"""
+        self.store_queries = queries
+
+    def set_month_loader(self, loader: Callable[[str], List[Dict]], unloaded_months: List[str],
+                         month_aggregates: Dict[str, Dict[str, List[int]]]) -> None:
+        """Configura la carga bajo demanda de los meses que no se cargaron al inicio"""
+        self.month_loader = loader
+        self._unloaded_months = set(unloaded_months)
+        # Los agregados guardados permiten colorear el calendario sin cargar el mes
+        for month, days in month_aggregates.items():
+            self._day_stats[month] = {date_str: list(counts) for date_str, counts in days.items()}
+
+    def ensure_month_loaded(self, month: str) -> None:
+        """Carga las tareas de un mes ("YYYY-MM" o "undated") si aún no están en memoria"""
+        if month in self._unloaded_months:
+            self._unloaded_months.discard(month)
+            self._day_stats.pop(month, None)
+            loaded = self.load_tasks(self.month_loader(month))
+            for callback in self.load_listeners:
+                callback(loaded)
+
+    def add_unloaded_tasks(self, tasks: List[Task]) -> None:
+        """Cuenta en los agregados tareas escritas directamente en el almacenamiento,
+        sin tenerlas en memoria; sus meses quedan pendientes de cargar"""
+        for task in tasks:
+            self._unloaded_months.add(self._month_of(task.scheduled_date))
+            self._count_day(task, 1)
+
+    def load_all_months(self) -> None:
+        """Carga todos los meses pendientes (consultas sobre toda la historia)"""
+        for month in sorted(self._unloaded_months):
+            self.ensure_month_loaded(month)
+
+    def get_unloaded_months(self) -> List[str]:
+        return sorted(self._unloaded_months)
+
+    @staticmethod
+    def _month_of(date_str: Optional[str]) -> str:
+        return date_str[:7] if date_str else "undated"
+
+    def _index_task(self, task: Task) -> None:
+        """Añade la tarea a todos los índices"""
+        self._tasks_by_id[task.id] = task
+        if task.scheduled_date:
+            self._ids_by_date.setdefault(task.scheduled_date, {})[task.id] = None
+        self._ids_by_category.setdefault(task.category, {})[task.id] = None
+        if task.completed:
+            self._completed_ids[task.id] = None
+        else:
+            self._pending_ids[task.id] = None
+        self._count_day(task, 1)
+
+    def _unindex_task(self, task: Task) -> None:
+        """Quita la tarea de todos los índices"""
+        self._tasks_by_id.pop(task.id, None)
+        self._discard_id(self._ids_by_date, task.scheduled_date, task.id)
+        self._discard_id(self._ids_by_category, task.category, task.id)
+        self._completed_ids.pop(task.id, None)
+        self._pending_ids.pop(task.id, None)
+        self._count_day(task, -1)
+
+    def _count_day(self, task: Task, delta: int) -> None:
+        """Suma o resta la tarea en los agregados de su día"""
+        date_str = task.scheduled_date
+        if not date_str:
+            return
+        month = self._day_stats.setdefault(date_str[:7], {})
+        counts = month.setdefault(date_str, [0, 0, 0])
+        counts[0] += delta
+        if task.completed:
+            counts[1] += delta
+        if task.priority >= 4:
+            counts[2] += delta
+        if counts[0] == 0:
+            del month[date_str]
+            if not month:
+                del self._day_stats[date_str[:7]]
+
+    @staticmethod
+    def _discard_id(index: Dict[str, Dict[str, None]], key: Optional[str], task_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(task_id, None)
+            if not bucket:
+                del index[key]
+
+    def _insert(self, task: Task, slot: int) -> None:
+        """Pone la tarea en su hueco (o al final) y en los índices"""
+        if slot == len(self._slots):
+            self._slots.append(task)
+        else:
+            self._slots[slot] = task
+            self._holes -= 1
+        self._slot_of[task.id] = slot
+        self._index_task(task)
+        self._notify("added", task)
+
+    def _remove(self, task: Task) -> int:
+        """Quita la tarea de la lista y los índices; devuelve su hueco"""
+        slot = self._slot_of.pop(task.id)
+        self._slots[slot] = None
+        self._holes += 1
+        self._unindex_task(task)
+        self._notify("removed", task)
+        return slot
+
+    def _maybe_compact(self) -> None:
+        """Compacta cuando los huecos nuevos superan la mitad de la lista (coste amortizado O(1))"""
+        if self._holes - self._kept_holes > max(COMPACT_MIN_HOLES, len(self._slots) // 2):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Quita los huecos que ningún paso de deshacer o rehacer puede volver a ocupar"""
+        referenced = {change[2] for entry in chain(self.undo_stack, self.redo_stack)
+                      for change in entry if change[0] != "update"}
+        new_slot: Dict[int, int] = {}
+        slots: List[Optional[Task]] = []
+        for slot, task in enumerate(self._slots):
+            if task is not None or slot in referenced:
+                new_slot[slot] = len(slots)
+                slots.append(task)
+        self._slots = slots
+        self._slot_of = {task.id: slot for slot, task in enumerate(slots) if task is not None}
+        self._holes = self._kept_holes = len(slots) - len(self._slot_of)
+
+        def renumber(entry: List[Change]) -> List[Change]:
+            return [change if change[0] == "update" else (change[0], change[1], new_slot[change[2]])
+                    for change in entry]
+        self.undo_stack = deque(map(renumber, self.undo_stack), maxlen=self.undo_stack.maxlen)
+        self.redo_stack = [renumber(entry) for entry in self.redo_stack]
+
+    def _set_fields(self, task: Task, fields: Dict[str, Any]) -> None:
+        """Cambia campos de la tarea manteniendo los índices al día"""
+        # Misma normalización que from_dict: prioridad entera y cadenas compartidas
+        fields = dict(fields)
+        if "priority" in fields:
+            fields["priority"] = int(fields["priority"])
+        for name in ("category", "scheduled_date"):
+            if isinstance(fields.get(name), str):
+                fields[name] = sys.intern(fields[name])
+        for callback in self.update_listeners:
+            callback(task)
+        affects_day = "completed" in fields or "priority" in fields or "scheduled_date" in fields
+        if affects_day:
+            self._count_day(task, -1)
+        if "category" in fields and fields["category"] != task.category:
+            self._discard_id(self._ids_by_category, task.category, task.id)
+            self._ids_by_category.setdefault(fields["category"], {})[task.id] = None
+        if "scheduled_date" in fields and fields["scheduled_date"] != task.scheduled_date:
+            self._discard_id(self._ids_by_date, task.scheduled_date, task.id)
+            if fields["scheduled_date"]:
+                self._ids_by_date.setdefault(fields["scheduled_date"], {})[task.id] = None
+        if "completed" in fields and fields["completed"] != task.completed:
+            if fields["completed"]:
+                self._pending_ids.pop(task.id, None)
+                self._completed_ids[task.id] = None
+            else:
+                self._completed_ids.pop(task.id, None)
+                self._pending_ids[task.id] = None
+        for name, value in fields.items():
+            setattr(task, name, value)
+        if affects_day:
+            self._count_day(task, 1)
+        self._notify("updated", task)
+
+    def _update(self, task: Task, fields: Dict[str, Any]) -> Change:
+        """Aplica los campos y devuelve el cambio para poder deshacerlo"""
+        before = {name: getattr(task, name) for name in fields}
+        self._set_fields(task, fields)
+        return ("update", task, before, dict(fields))
+
+    def _record(self, changes: List[Change]) -> None:
+        """Apila una acción en el historial de deshacer"""
+        if self._batch_changes is not None:
+            self._batch_changes.extend(changes)
+        elif changes:
+            self.undo_stack.append(changes)
+            self.redo_stack.clear()
+            # Los huecos solo se renumeran cuando ningún cambio está a medio registrar
+            self._maybe_compact()
 
     def add_task(self, title: str, description: str, category: str, 
                 priority: int, scheduled_date: str = None) -> Task:
         """Añade una nueva tarea"""
-        self._save_state()
+        self.ensure_month_loaded(self._month_of(scheduled_date))
         task = Task(title, description, category, priority, scheduled_date)
-        self.tasks.append(task)
+        slot = len(self._slots)
+        self._insert(task, slot)
+        self._record([("add", task, slot)])
         return task
 
     def complete_task(self, task_id: str) -> Optional[Task]:
         """Marca una tarea como completada"""
-        self._save_state()
         task = self.get_task_by_id(task_id)
         if task:
-            task.complete()
+            self._record([self._update(task, {
+                "completed": True,
+                "completed_at": datetime.now().isoformat()
+            })])
         return task
 
     def delete_task(self, task_id: str) -> bool:
         """Elimina una tarea"""
-        self._save_state()
         task = self.get_task_by_id(task_id)
         if task:
-            self.tasks.remove(task)
+            self._record([("remove", task, self._remove(task))])
             return True
         return False
 
+    def _find_tasks(self, task_ids: Iterable[str]) -> List[Task]:
+        """Tareas existentes de la lista de ids, sin repetir"""
+        found = {}
+        for task_id in task_ids:
+            task = self._tasks_by_id.get(task_id)
+            if task:
+                found[task.id] = task
+        return list(found.values())
+
+    def complete_tasks(self, task_ids: Iterable[str]) -> List[Task]:
+        """Completa varias tareas pendientes como una sola acción"""
+        completed_at = datetime.now().isoformat()
+        tasks = [task for task in self._find_tasks(task_ids) if not task.completed]
+        with self.batch():
+            self._record([self._update(task, {"completed": True, "completed_at": completed_at})
+                          for task in tasks])
+        return tasks
+
+    def edit_tasks(self, task_ids: Iterable[str], category: Optional[str] = None,
+                   priority: Optional[int] = None) -> List[Task]:
+        """Cambia la categoría y/o la prioridad de varias tareas como una sola acción"""
+        fields = {name: value for name, value in (("category", category), ("priority", priority))
+                  if value is not None}
+        tasks = self._find_tasks(task_ids)
+        if fields:
+            with self.batch():
+                self._record([self._update(task, fields) for task in tasks])
+        return tasks
+
+    def delete_tasks(self, task_ids: Iterable[str]) -> List[Task]:
+        """Elimina varias tareas como una sola acción"""
+        tasks = self._find_tasks(task_ids)
+        with self.batch():
+            self._record([("remove", task, self._remove(task)) for task in tasks])
+        return tasks
+
     def get_task_by_id(self, task_id: str) -> Optional[Task]:
         """Obtiene una tarea por su ID"""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        return self._tasks_by_id.get(task_id)
 
     def get_all_tasks(self) -> List[Task]:
+        self.load_all_months()
         return self.tasks
 
     def get_tasks_by_category(self, category: str) -> List[Task]:
-        return [task for task in self.tasks if task.category == category]
+        return self._query_history("category", category, self._ids_by_category.get(category, {}))
 
     def get_tasks_for_date(self, date_str: str) -> List[Task]:
         """Obtiene las tareas programadas para una fecha específica"""
-        return [task for task in self.tasks if task.scheduled_date == date_str]
+        self.ensure_month_loaded(self._month_of(date_str))
+        return self._tasks_from_ids(self._ids_by_date.get(date_str, {}))
+
+    def get_completed_tasks(self) -> List[Task]:
+        return self._query_history("completed", True, self._completed_ids)
+
+    def get_pending_tasks(self) -> List[Task]:
+        return self._query_history("completed", False, self._pending_ids)
+
+    def _query_history(self, query: str, value: Any, ids: Dict[str, None]) -> List[Task]:
+        """Tareas cargadas del índice `ids` más las que devuelva la consulta del
+        almacenamiento para los meses no cargados. Estas últimas son copias de
+        solo lectura (para modificarlas hay que cargar su mes); sin consulta
+        indexada se carga toda la historia."""
+        store_query = self.store_queries.get(query)
+        if store_query is None or not self._unloaded_months:
+            self.load_all_months()
+            return self._tasks_from_ids(ids)
+        tasks = self._tasks_from_ids(ids)
+        tasks.extend(Task.from_dict(row) for row in store_query(value)
+                     if row["id"] not in self._tasks_by_id)
+        return tasks
+
+    def _tasks_from_ids(self, ids: Dict[str, None]) -> List[Task]:
+        tasks_by_id = self._tasks_by_id
+        return [tasks_by_id[task_id] for task_id in ids]
 
     def undo(self) -> bool:
         """Deshace la última acción"""
         if not self.undo_stack:
             return False
-        self.redo_stack.append([Task(**task.to_dict()) for task in self.tasks])
-        self.tasks = self.undo_stack.pop()
+        changes = self.undo_stack.pop()
+        # Deshacer una acción en bloque también avisa una sola vez
+        with self._collect_notifications():
+            for change in reversed(changes):
+                self._revert(change)
+        self.redo_stack.append(changes)
+        self._maybe_compact()
         return True
 
     def redo(self) -> bool:
         """Rehace la última acción deshecha"""
         if not self.redo_stack:
             return False
-        self.undo_stack.append([Task(**task.to_dict()) for task in self.tasks])
-        self.tasks = self.redo_stack.pop()
+        changes = self.redo_stack.pop()
+        with self._collect_notifications():
+            for change in changes:
+                self._apply(change)
+        self.undo_stack.append(changes)
+        self._maybe_compact()
         return True
 
+    def _apply(self, change: Change) -> None:
+        kind, task = change[0], change[1]
+        if kind == "add":
+            self._insert(task, change[2])
+        elif kind == "remove":
+            self._remove(task)
+        else:
+            self._set_fields(task, change[3])
+
+    def _revert(self, change: Change) -> None:
+        kind, task = change[0], change[1]
+        if kind == "add":
+            self._remove(task)
+        elif kind == "remove":
+            self._insert(task, change[2])
+        else:
+            self._set_fields(task, change[2])
+
     def edit_task(self, task_id: str, title: str, description: str, 
                  category: str, priority: int) -> Optional[Task]:
         """Edita una tarea existente"""
-        self._save_state()
         task = self.get_task_by_id(task_id)
         if task:
-            task.title = title
-            task.description = description
-            task.category = category
-            task.priority = priority
+            self._record([self._update(task, {
+                "title": title,
+                "description": description,
+                "category": category,
+                "priority": priority
+            })])
         return task
 
+    def get_day_aggregate(self, date_str: str) -> Tuple[int, int, int]:
+        """Devuelve (total, completadas, alta prioridad) de un día"""
+        counts = self._day_stats.get(date_str[:7], {}).get(date_str)
+        return tuple(counts) if counts else (0, 0, 0)
+
+    def get_month_aggregates(self, month: str) -> Dict[str, Tuple[int, int, int]]:
+        """Agregados de cada día con tareas de un mes ("YYYY-MM")"""
+        return {date_str: tuple(counts) for date_str, counts in self._day_stats.get(month, {}).items()}
+
     def get_tasks_by_dates(self) -> Dict[str, List[Task]]:
         """Agrupa las tareas por fecha"""
-        tasks_by_date = {}
-        for task in self.tasks:
-            date = task.scheduled_date
-            if date:
-                if date not in tasks_by_date:
-                    tasks_by_date[date] = []
-                tasks_by_date[date].append(task)
-        return tasks_by_date
-
-    def _save_state(self) -> None:
-        """Guarda el estado actual para deshacer/rehacer"""
-        tasks_copy = [Task(**task.to_dict()) for task in self.tasks]
-        self.undo_stack.append(tasks_copy)
-        self.redo_stack.clear()
+        self.load_all_months()
+        return {date: self._tasks_from_ids(ids) for date, ids in self._ids_by_date.items()}
@@ -0,0 +1,137 @@
+import io
+import os
+import tempfile
+import unittest
+import bulk_io_IPH as bulk_io
+
+TASKS = [
+    {"id": "a1", "title": "Leer, escribir; y \"citar\"", "description": "línea 1\nlínea 2 \\ barra",
+     "category": "Trabajo", "priority": 5, "scheduled_date": "2024-05-01",
+     "created_at": "2024-04-30T08:15:00", "completed": True, "completed_at": "2024-05-01T09:30:00"},
+    {"id": "b2", "title": "Correr 5 km 🏃", "description": "",
+     "category": "Salud, deporte", "priority": 1, "scheduled_date": None,
+     "created_at": "2024-04-29T20:00:00", "completed": False, "completed_at": None},
+    {"id": "c3", "title": "Título muy largo " + "ñ" * 80, "description": "x" * 200,
+     "category": "Estudio", "priority": 3, "scheduled_date": "2024-06-15",
+     "created_at": "2024-06-01T00:00:00", "completed": False, "completed_at": None},
+]
+
+def roundtrip(fmt, tasks):
+    """Exporta y vuelve a importar las tareas; devuelve (filas normalizadas, contadores)"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tareas")
+        assert bulk_io.export_file(path, tasks, fmt) == len(tasks)
+        imported = []
+        def add_batch(batch):
+            imported.extend(batch)
+            return len(batch)
+        counts = bulk_io.import_file(path, add_batch, fmt, batch_size=2)
+    return imported, counts
+
+def import_text(fmt, text):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tareas")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        imported = []
+        def add_batch(batch):
+            imported.extend(batch)
+            return len(batch)
+        counts = bulk_io.import_file(path, add_batch, fmt)
+    return imported, counts
+
+
+class RoundTripTests(unittest.TestCase):
+    def test_csv_and_jsonl_keep_every_field(self):
+        for fmt in ("csv", "jsonl"):
+            with self.subTest(fmt=fmt):
+                imported, counts = roundtrip(fmt, TASKS)
+                self.assertEqual(counts, {"read": 3, "added": 3, "invalid": 0})
+                self.assertEqual(imported, TASKS)
+
+    def test_ical_keeps_text_dates_and_status(self):
+        imported, counts = roundtrip("ical", TASKS)
+        self.assertEqual(counts, {"read": 3, "added": 3, "invalid": 0})
+        for original, task in zip(TASKS, imported):
+            for field in ("id", "title", "description", "category", "priority",
+                          "scheduled_date", "created_at", "completed", "completed_at"):
+                self.assertEqual(task[field], original[field], field)
+
+    def test_ical_priority_mapping(self):
+        for stars in range(1, 6):
+            self.assertEqual(bulk_io.ICAL_TO_STARS[bulk_io.STARS_TO_ICAL[stars]], stars)
+        imported, _ = roundtrip("ical", [dict(TASKS[0], priority=stars) for stars in range(1, 6)])
+        self.assertEqual([task["priority"] for task in imported], [1, 2, 3, 4, 5])
+
+    def test_ical_lines_are_folded_to_75_bytes(self):
+        f = io.StringIO()
+        list(bulk_io.write_ical(f, TASKS))
+        for line in f.getvalue().split("\r\n"):
+            self.assertLessEqual(len(line.encode("utf-8")), 75)
+
+    def test_ical_escaping(self):
+        self.assertEqual(bulk_io._ical_escape("a,b;c\\d\ne"), "a\\,b\\;c\\\\d\\ne")
+        self.assertEqual(bulk_io._ical_unescape("a\\,b\\;c\\\\d\\ne\\Nf"), "a,b;c\\d\ne\nf")
+        self.assertEqual(bulk_io._ical_split("Tra\\,bajo,Salud"), ["Tra\\,bajo", "Salud"])
+
+    def test_batches(self):
+        self.assertEqual(list(bulk_io.batches(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+class MalformedInputTests(unittest.TestCase):
+    def test_jsonl_bad_lines_are_counted(self):
+        imported, counts = import_text("jsonl", '[1, 2]\n{"title": "ok"}\n{roto\n"x"\n{"title": 5}\n\n')
+        self.assertEqual(counts, {"read": 5, "added": 1, "invalid": 4})
+        self.assertEqual(imported[0]["title"], "ok")
+
+    def test_jsonl_text_fields_must_be_strings(self):
+        rows = ['{"title": "ok", "description": null, "category": null}',
+                '{"title": "d", "description": 5}',
+                '{"title": "c", "category": ["x"]}',
+                '{"title": "n", "category": 7}',
+                '{"title": ["t"]}',
+                '{"title": {"a": 1}}']
+        imported, counts = import_text("jsonl", "\n".join(rows) + "\n")
+        self.assertEqual(counts, {"read": 6, "added": 1, "invalid": 5})
+        self.assertEqual((imported[0]["description"], imported[0]["category"]), ("", "Otros"))
+
+    def test_csv_invalid_rows_are_counted(self):
+        text = ("title,priority,scheduled_date,created_at,completed,completed_at\n"
+                "ok,3,2024-05-01,,sí,2024-05-01T10:00:00\n"
+                ",3,,,,\n"
+                "prioridad,9,,,,\n"
+                "fecha,3,2024-13-01,,,\n"
+                "creada,3,,not-a-date,,\n"
+                "completada,3,,,1,garbage\n")
+        imported, counts = import_text("csv", text)
+        self.assertEqual(counts, {"read": 6, "added": 1, "invalid": 5})
+        self.assertTrue(imported[0]["completed"])
+
+    def test_ical_bad_properties_skip_only_their_todo(self):
+        todo = "BEGIN:VTODO\r\nUID:{}\r\nSUMMARY:tarea\r\n{}END:VTODO\r\n"
+        text = ("BEGIN:VCALENDAR\r\n"
+                + todo.format(1, "PRIORITY:high\r\n")
+                + todo.format(2, "DUE;VALUE=DATE:2024xx\r\n")
+                + todo.format(3, "CREATED:nope\r\n")
+                + todo.format(4, "COMPLETED:20240501T100000Z\r\n")
+                + "END:VCALENDAR\r\n")
+        imported, counts = import_text("ical", text)
+        self.assertEqual(counts, {"read": 4, "added": 1, "invalid": 3})
+        self.assertEqual(imported[0]["id"], "4")
+        self.assertTrue(imported[0]["completed"])
+
+    def test_ical_export_skips_unreadable_timestamps(self):
+        f = io.StringIO()
+        list(bulk_io.write_ical(f, [dict(TASKS[0], created_at="ayer", completed_at="x")]))
+        text = f.getvalue()
+        self.assertNotIn("CREATED", text)
+        self.assertNotIn("COMPLETED:", text)
+        self.assertIn("STATUS:COMPLETED", text)
+
+    def test_unknown_extension(self):
+        with self.assertRaises(ValueError):
+            bulk_io.format_of("tareas.xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
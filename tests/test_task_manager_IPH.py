@@ -0,0 +1,59 @@
+import random
+import unittest
+import task_manager_IPH
+from task_manager_IPH import TaskManager
+
+
+class UndoOrderTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = TaskManager(max_undo=1000)
+
+    def order(self):
+        return [task.id for task in self.manager.tasks]
+
+    def test_undo_delete_restores_position(self):
+        ids = [self.manager.add_task(f"t{i}", "", "Trabajo", 1).id for i in range(5)]
+        self.manager.delete_task(ids[2])
+        self.manager.delete_tasks([ids[0], ids[4]])
+        self.assertEqual(self.order(), [ids[1], ids[3]])
+        self.manager.undo()
+        self.assertEqual(self.order(), [ids[0], ids[1], ids[3], ids[4]])
+        self.manager.undo()
+        self.assertEqual(self.order(), ids)
+        self.manager.redo()
+        self.manager.redo()
+        self.assertEqual(self.order(), [ids[1], ids[3]])
+
+    def test_random_history_survives_compaction(self):
+        rng = random.Random(7)
+        states, position = [[]], 0
+        original = task_manager_IPH.COMPACT_MIN_HOLES
+        task_manager_IPH.COMPACT_MIN_HOLES = 2
+        try:
+            for step in range(2000):
+                ids, r = self.order(), rng.random()
+                if r < 0.3 or not ids:
+                    self.manager.add_task(f"t{step}", "", "Trabajo", 1)
+                elif r < 0.45:
+                    self.manager.delete_task(rng.choice(ids))
+                elif r < 0.55:
+                    self.manager.delete_tasks(rng.sample(ids, min(len(ids), 4)))
+                else:
+                    if r < 0.8 and position > 0:
+                        self.manager.undo()
+                        position -= 1
+                    elif r >= 0.8 and position < len(states) - 1:
+                        self.manager.redo()
+                        position += 1
+                    self.assertEqual(self.order(), states[position])
+                    continue
+                del states[position + 1:]
+                states.append(self.order())
+                position += 1
+                self.assertEqual(set(self.manager._tasks_by_id), set(states[position]))
+        finally:
+            task_manager_IPH.COMPACT_MIN_HOLES = original
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,24 @@
 import customtkinter as ctk
 from typing import Dict, Any
-from task_manager_IPH import TaskManager
+from task_manager_IPH import TaskManager, CATEGORIES
 from stats_manager_IPH import StatsManager
-import tkcalendar
-from datetime import datetime
-from achievement_manager_IPH import AchievementManager
-from typing import List
-import tkinter.ttk as ttk
-import random
+from datetime import datetime, date
+from task_list_view_IPH import TaskRow, VirtualTaskList
+from typing import Callable, List
+
+# achievement_manager_IPH no se importa aquí: los logros no hacen falta para el primer frame
 
 class UIManager:
-    def __init__(self, root: ctk.CTk, task_manager: TaskManager, stats_manager: StatsManager):
+    def __init__(self, root: ctk.CTk, task_manager: TaskManager, stats_manager: StatsManager,
+                 achievement_manager=None, defer_panels: bool = False,
+                 achievement_factory: Callable[[], Any] = None):
         self.root = root
         self.username = "Usuario"  # Valor por defecto fijo
         self.task_manager = task_manager
         self.stats_manager = stats_manager
-        self.achievement_manager = AchievementManager()
+        # Gestor de logros, o quién lo crea la primera vez que se usa
+        self._achievement_manager = achievement_manager
+        self._achievement_factory = achievement_factory
         
         # Colores modernos para tema claro
         self.light_theme = {
@@ -46,16 +49,33 @@ class UIManager:
         self.selected_date = datetime.now().strftime('%Y-%m-%d')
         
         self.update_theme()
-        self.setup_ui()
+        # Con defer_panels el panel de estadísticas y el calendario se crean
+        # después del primer frame, con setup_deferred_panels
+        self.setup_ui(defer_panels)
+
+        # Actualizar solo la fila y el día afectados por cada cambio; las
+        # operaciones en bloque refrescan la lista y cada día una sola vez
+        self.task_manager.add_listener(self.on_task_change, self.on_tasks_change)
 
         # Agregar referencia al método de guardado
         self.save_callback = None
 
+    @property
+    def achievement_manager(self):
+        """Gestor de logros; se importa y crea al usarlo por primera vez"""
+        if self._achievement_manager is None:
+            if self._achievement_factory is not None:
+                self._achievement_manager = self._achievement_factory()
+            else:
+                from achievement_manager_IPH import AchievementManager
+                self._achievement_manager = AchievementManager()
+        return self._achievement_manager
+
     def set_save_callback(self, callback):
         """Establece el callback para guardar datos"""
         self.save_callback = callback
 
-    def setup_ui(self):
+    def setup_ui(self, defer_panels: bool = False):
         self.selected_date = datetime.now().strftime('%Y-%m-%d')
         
         # Configuración inicial del tema
@@ -74,12 +94,18 @@ class UIManager:
         # Configurar los componentes de la UI
         self.setup_task_input()
         self.setup_task_list()
-        self.setup_stats_panel()
-        self.setup_calendar()
+        if not defer_panels:
+            self.setup_deferred_panels()
         
         # Finalmente, configuramos los colores
         self.update_theme()
 
+    def setup_deferred_panels(self):
+        """Panel de estadísticas y calendario (tkcalendar se importa aquí)"""
+        self.setup_stats_panel()
+        self.setup_calendar()
+        self.update_stats_display()
+
     def update_theme(self):
         theme = self.light_theme if self.appearance_mode == "light" else self.dark_theme
         for key, value in theme.items():
@@ -89,8 +115,8 @@ class UIManager:
         if hasattr(self, 'welcome_label'):
             self.welcome_label.configure(text_color=self.text_color)
         
-        self.update_calendar_style()
         if hasattr(self, 'calendar'):
+            self.update_calendar_style()
             self.update_calendar_colors()
 
     def update_all_widgets_colors(self):
@@ -127,6 +153,7 @@ class UIManager:
         self.right_frame.configure(fg_color=self.bg_color)
         self.header_frame.configure(fg_color=self.bg_color)
         self.task_list_frame.configure(fg_color=self.bg_color)
+        self.bulk_frame.configure(fg_color=self.bg_color)
         
         # Actualizar panel de estadísticas
         if hasattr(self, 'stats_frame'):
@@ -141,7 +168,8 @@ class UIManager:
         
         # Actualizar otros elementos
         self.refresh_task_list()
-        self.update_calendar_style()
+        if hasattr(self, 'calendar'):
+            self.update_calendar_style()
 
     def setup_main_layout(self):
         # Frame principal
@@ -197,8 +225,7 @@ class UIManager:
 
         # Categoría
         self.category_var = ctk.StringVar(value="Personal")
-        categories = ["Personal", "Trabajo", "Estudio", "Salud", "Ejercicio", "Hogar", "Proyectos", "Otros"]
-        self.category_menu = ctk.CTkOptionMenu(input_frame, values=categories, variable=self.category_var)
+        self.category_menu = ctk.CTkOptionMenu(input_frame, values=list(CATEGORIES), variable=self.category_var)
         self.category_menu.pack(fill="x", padx=5, pady=5)
 
         # Prioridad con estrellas
@@ -247,10 +274,84 @@ class UIManager:
                 break
 
     def setup_task_list(self):
-        # Frame para lista de tareas
-        self.task_list_frame = ctk.CTkScrollableFrame(self.left_frame)
+        self.setup_bulk_actions()
+
+        # Lista virtualizada: solo crea widgets para las filas visibles
+        self.task_list_frame = VirtualTaskList(
+            self.left_frame,
+            row_factory=self.create_task_row,
+            # Ordenar tareas: primero no completadas, luego por prioridad
+            sort_key=lambda task: (task.completed, -task.priority)
+        )
         self.task_list_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
+    def setup_bulk_actions(self):
+        """Barra de acciones sobre las tareas seleccionadas con las casillas"""
+        self.bulk_frame = ctk.CTkFrame(self.left_frame)
+        self.bulk_frame.pack(fill="x", padx=5, pady=(5, 0))
+
+        self.select_all_var = ctk.BooleanVar(value=False)
+        self.select_all_box = ctk.CTkCheckBox(
+            self.bulk_frame, text="Todas", variable=self.select_all_var,
+            command=self.toggle_select_all, width=70
+        )
+        self.select_all_box.pack(side="left", padx=5)
+
+        self.selection_label = ctk.CTkLabel(self.bulk_frame, text="0 seleccionadas")
+        self.selection_label.pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            self.bulk_frame, text="🗑", width=30, height=30, font=("Segoe UI", 13),
+            fg_color=self.danger_color, hover_color=self.danger_color,
+            command=self.delete_selected
+        ).pack(side="right", padx=2)
+
+        self.bulk_category_var = ctk.StringVar(value="Mover a...")
+        ctk.CTkOptionMenu(
+            self.bulk_frame, values=list(CATEGORIES), variable=self.bulk_category_var,
+            command=self.move_selected_to_category, width=110
+        ).pack(side="right", padx=2)
+
+        ctk.CTkButton(
+            self.bulk_frame, text="✓", width=30, height=30, font=("Segoe UI", 14),
+            fg_color=self.success_color, hover_color=self.success_color,
+            command=self.complete_selected
+        ).pack(side="right", padx=2)
+
+    def on_task_selected(self, task_id: str, selected: bool):
+        self.task_list_frame.set_selected(task_id, selected)
+        self.update_selection_label()
+
+    def toggle_select_all(self):
+        if self.select_all_var.get():
+            self.task_list_frame.select_all()
+        else:
+            self.task_list_frame.clear_selection()
+        self.update_selection_label()
+
+    def update_selection_label(self):
+        count = len(self.task_list_frame.selected)
+        self.selection_label.configure(text=f"{count} seleccionadas")
+        self.select_all_var.set(bool(count) and count == len(self.task_list_frame.items))
+
+    def complete_selected(self):
+        """Completa las tareas seleccionadas en un solo paso de deshacer"""
+        tasks = self.task_manager.complete_tasks(self.task_list_frame.selected_ids())
+        self.task_list_frame.clear_selection()
+        self.update_selection_label()
+        if tasks:
+            self.celebrate_completion(tasks[-1])
+
+    def delete_selected(self):
+        removed = self.task_manager.delete_tasks(self.task_list_frame.selected_ids())
+        self.update_selection_label()
+        if any(task.completed for task in removed):
+            self.update_stats_display()
+
+    def move_selected_to_category(self, category: str):
+        self.task_manager.edit_tasks(self.task_list_frame.selected_ids(), category=category)
+        self.bulk_category_var.set("Mover a...")
+
     def setup_stats_panel(self):
         # Frame para estadísticas con color de fondo específico
         self.stats_frame = ctk.CTkFrame(
@@ -284,13 +385,43 @@ class UIManager:
         )
         self.points_label.pack(pady=5)
 
+        # Análisis de todo el historial (necesita numpy)
+        self.analytics_button = ctk.CTkButton(
+            self.stats_details_frame,
+            text="📊 Ver análisis",
+            command=self.show_analytics_popup,
+            font=("Arial", 14)
+        )
+        self.analytics_button.pack(pady=5)
+
+    def show_analytics_popup(self):
+        """Muestra series, rachas, categorías y mapa de calor de todo el historial"""
+        import analytics_IPH
+        if not analytics_IPH.is_available():
+            lines = ["Instala numpy para ver el análisis del historial"]
+        else:
+            # El análisis abarca todos los meses, no solo los cargados
+            self.task_manager.load_all_months()
+            lines = self.stats_manager.get_analytics().summary()
+
+        popup = ctk.CTkToplevel(self.root)
+        popup.title("Análisis")
+        popup.grab_set()
+
+        textbox = ctk.CTkTextbox(popup, width=480, height=420, font=("Consolas", 13))
+        textbox.pack(expand=True, fill="both", padx=20, pady=20)
+        textbox.insert("end", "\n".join(lines))
+        textbox.configure(state="disabled")
+
+        ctk.CTkButton(popup, text="Cerrar", command=popup.destroy).pack(pady=(0, 20))
+
     def setup_calendar(self):
+        import tkcalendar
         # Eliminar el streak frame duplicado de arriba y mantener solo el de abajo
         calendar_frame = ctk.CTkFrame(self.right_frame, fg_color=self.secondary_bg)
         calendar_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Configurar estilo del calendario
-        style = ttk.Style()
         self.update_calendar_style()
         
         self.calendar = tkcalendar.Calendar(
@@ -304,6 +435,10 @@ class UIManager:
         )
         self.calendar.pack(fill="both", expand=True, padx=5, pady=5)
         self.calendar.bind("<<CalendarSelected>>", self.on_date_selected)
+        self.calendar.bind("<<CalendarMonthChanged>>", self.sync_calendar_month)
+        
+        # Eventos pintados por mes: {"YYYY-MM": {fecha: (id_evento, agregado)}}
+        self.calendar_days = {}
 
         # Streak frame mejorado
         streak_frame = ctk.CTkFrame(self.right_frame, fg_color=self.accent_color)
@@ -329,87 +464,30 @@ class UIManager:
         priority = self.priority_var.get()
 
         if title:
-            task = self.task_manager.add_task(
+            self.task_manager.add_task(
                 title, description, category, priority, self.selected_date)
-            self.create_task_widget(task)
             self.clear_inputs()
-            self.update_calendar_colors()  # Actualizar colores inmediatamente
 
-    def create_task_widget(self, task):
-        task_frame = ctk.CTkFrame(
-            self.task_list_frame,
-            fg_color=self.secondary_bg if task.completed else self.bg_color
+    def create_task_row(self, parent) -> TaskRow:
+        """Crea una fila reutilizable para la lista virtualizada"""
+        return TaskRow(
+            parent,
+            on_complete=self.complete_task,
+            on_edit=self.edit_task_dialog,
+            on_delete=self.delete_task,
+            on_select=self.on_task_selected
         )
-        task_frame.pack(fill="x", padx=10, pady=5)
 
-        info_frame = ctk.CTkFrame(task_frame, fg_color="transparent")
-        info_frame.pack(side="left", fill="x", expand=True, padx=5)
-        
-        title_label = ctk.CTkLabel(
-            info_frame,
-            text=task.title,
-            font=("Segoe UI", 12, "bold"),
-            text_color=self.fg_color
-        )
-        title_label.pack(anchor="w")
-
-        if task.description:
-            desc_label = ctk.CTkLabel(
-                info_frame,
-                text=task.description,
-                font=("Segoe UI", 10),
-                text_color=self.fg_color
-            )
-            desc_label.pack(anchor="w")
-
-        meta_text = f"📋 {task.category} | {'⭐' * task.priority}"
-        meta_label = ctk.CTkLabel(
-            info_frame,
-            text=meta_text,
-            font=("Segoe UI", 10),
-            text_color=self.fg_color
-        )
-        meta_label.pack(anchor="w")
-
-        button_frame = ctk.CTkFrame(task_frame, fg_color="transparent")
-        button_frame.pack(side="right", padx=5)
-
-        if not task.completed:
-            complete_btn = ctk.CTkButton(
-                button_frame,
-                text="✓",
-                width=30,
-                height=30,
-                font=("Segoe UI", 14),  # Ajustado el tamaño de fuente
-                command=lambda: self.complete_task(task.id),
-                fg_color=self.success_color,
-                hover_color=self.success_color
-            )
-            complete_btn.pack(side="left", padx=2)
-            
-            edit_btn = ctk.CTkButton(
-                button_frame,
-                text="✎",
-                width=30,
-                height=30,
-                font=("Segoe UI", 14),  
-                command=lambda: self.edit_task_dialog(task),
-                fg_color=self.accent_color,
-                hover_color=self.accent_color
-            )
-            edit_btn.pack(side="left", padx=2)
-
-        delete_btn = ctk.CTkButton(
-            button_frame,
-            text="🗑",  
-            width=30,
-            height=30,
-            font=("Segoe UI", 13),  
-            command=lambda: self.delete_task(task.id),
-            fg_color=self.danger_color,
-            hover_color=self.danger_color
-        )
-        delete_btn.pack(side="left", padx=2)
+    def _task_colors(self) -> Dict[str, str]:
+        """Colores del tema actual que usan las filas de tareas"""
+        return {
+            "bg_color": self.bg_color,
+            "secondary_bg": self.secondary_bg,
+            "fg_color": self.fg_color,
+            "success_color": self.success_color,
+            "accent_color": self.accent_color,
+            "danger_color": self.danger_color
+        }
 
     def clear_inputs(self):
         self.title_entry.delete(0, 'end')
@@ -420,31 +498,32 @@ class UIManager:
     def complete_task(self, task_id):
         task = self.task_manager.complete_task(task_id)
         if task:
-            self.stats_manager.update_task_completion(task)
-            
-            # Obtener estadísticas actualizadas
-            stats = self.stats_manager.get_stats()
-            
-            # Actualizar la racha en el botón azul
-            if hasattr(self, 'streak_label'):
-                self.streak_label.configure(
-                    text=f"🔥 Racha actual: {stats['current_streak']} días"
-                )
-            
-            # Obtener mensaje motivacional contextualizado
-            message = self.achievement_manager.get_random_message(task=task, stats=stats)
-            
-            # Mostrar mensaje motivacional
-            self.show_motivation_popup(message)
-            
-            # Verificar logros
-            unlocked = self.achievement_manager.check_achievements(stats, task)
-            if unlocked:
-                self.show_achievements_popup(unlocked)
-            
-            self.update_stats_display()
-            self.refresh_task_list()
-            self.update_calendar_colors()
+            self.celebrate_completion(task)
+
+    def celebrate_completion(self, task):
+        """Racha, mensaje, logros y estadísticas tras completar una o varias tareas"""
+        # StatsManager ya aplicó la completada como listener de TaskManager
+        # Obtener estadísticas actualizadas
+        stats = self.stats_manager.get_stats()
+        
+        # Actualizar la racha en el botón azul
+        if hasattr(self, 'streak_label'):
+            self.streak_label.configure(
+                text=f"🔥 Racha actual: {stats['current_streak']} días"
+            )
+        
+        # Obtener mensaje motivacional contextualizado
+        message = self.achievement_manager.get_random_message(task=task, stats=stats)
+        
+        # Mostrar mensaje motivacional
+        self.show_motivation_popup(message)
+        
+        # Verificar logros
+        unlocked = self.achievement_manager.check_achievements(stats, task)
+        if unlocked:
+            self.show_achievements_popup(unlocked)
+        
+        self.update_stats_display()
 
     def show_motivation_popup(self, message: str):
         popup = ctk.CTkToplevel(self.root)
@@ -542,7 +621,7 @@ class UIManager:
         for achievement in achievements:
             achievement_label = ctk.CTkLabel(
                 achievements_frame,
-                text=f"🌟 {achievement}",
+                text=f"🌟 {self.achievement_manager.get_achievement_name(achievement)}",
                 font=("Arial", 16, "bold"),
                 pady=10
             )
@@ -575,24 +654,7 @@ class UIManager:
         task = self.task_manager.get_task_by_id(task_id)
         if task and self.task_manager.delete_task(task_id):
             if task.completed:
-                self.stats_manager.remove_task_points(task)
                 self.update_stats_display()
-            self.refresh_task_list()
-            self.update_calendar_colors()
-
-    def refresh_task_list(self):
-        """Actualiza la lista de tareas mostrada"""
-        for widget in self.task_list_frame.winfo_children():
-            widget.destroy()
-        
-        # Obtener tareas para la fecha seleccionada
-        tasks = self.task_manager.get_tasks_for_date(self.selected_date)
-        
-        # Ordenar tareas: primero no completadas, luego por prioridad
-        tasks.sort(key=lambda x: (x.completed, -x.priority))
-        
-        for task in tasks:
-            self.create_task_widget(task)
 
     def update_stats_display(self):
         """Actualiza la visualización de las estadísticas"""
@@ -647,7 +709,7 @@ class UIManager:
         category_var = ctk.StringVar(value=task.category)
         category_menu = ctk.CTkOptionMenu(
             scroll_frame,
-            values=["Personal", "Trabajo", "Estudio", "Salud", "Ejercicio", "Otro"],
+            values=list(CATEGORIES),
             variable=category_var,
             width=300
         )
@@ -828,7 +890,7 @@ class UIManager:
         for achievement in achievements:
             achievement_label = ctk.CTkLabel(
                 achievements_frame,
-                text=f"🌟 {achievement}",
+                text=f"🌟 {self.achievement_manager.get_achievement_name(achievement)}",
                 font=("Arial", 16, "bold"),
                 pady=10
             )
@@ -861,24 +923,7 @@ class UIManager:
         task = self.task_manager.get_task_by_id(task_id)
         if task and self.task_manager.delete_task(task_id):
             if task.completed:
-                self.stats_manager.remove_task_points(task)
                 self.update_stats_display()
-            self.refresh_task_list()
-            self.update_calendar_colors()
-
-    def refresh_task_list(self):
-        """Actualiza la lista de tareas mostrada"""
-        for widget in self.task_list_frame.winfo_children():
-            widget.destroy()
-        
-        # Obtener tareas para la fecha seleccionada
-        tasks = self.task_manager.get_tasks_for_date(self.selected_date)
-        
-        # Ordenar tareas: primero no completadas, luego por prioridad
-        tasks.sort(key=lambda x: (x.completed, -x.priority))
-        
-        for task in tasks:
-            self.create_task_widget(task)
 
     def update_stats_display(self):
         """Actualiza la visualización de las estadísticas"""
@@ -925,7 +970,7 @@ class UIManager:
         category_var = ctk.StringVar(value=task.category)
         category_menu = ctk.CTkOptionMenu(
             scroll_frame,
-            values=["Personal", "Trabajo", "Estudio", "Salud", "Ejercicio", "Otro"],
+            values=list(CATEGORIES),
             variable=category_var,
             width=300
         )
@@ -997,59 +1042,110 @@ class UIManager:
                 break
 
     def refresh_task_list(self):
-        # Limpiar lista actual
-        for widget in self.task_list_frame.winfo_children():
-            widget.destroy()
-        
-        # Obtener tareas para la fecha seleccionada
+        """Actualiza la lista de tareas mostrada reutilizando las filas visibles"""
         tasks = self.task_manager.get_tasks_for_date(self.selected_date)
+        self.task_list_frame.set_items(tasks, self._task_colors())
+
+    def on_task_change(self, event, task):
+        """Aplica en la interfaz solo el cambio de la tarea afectada"""
+        if event != "removed" and task.scheduled_date == self.selected_date:
+            self.task_list_frame.upsert_item(task)
+        else:
+            self.task_list_frame.remove_item(task)
+            self.update_selection_label()
         
-        # Ordenar tareas: primero no completadas, luego por prioridad
-        tasks.sort(key=lambda x: (x.completed, -x.priority))
-        
-        for task in tasks:
-            self.create_task_widget(task)
+        if task.scheduled_date:
+            self.update_calendar_day(task.scheduled_date)
+
+    def on_tasks_change(self, changes):
+        """Cambios en bloque: refresca la lista una vez y cada día afectado una vez"""
+        dates = {task.scheduled_date for _, task in changes if task.scheduled_date}
+        if self.selected_date in dates:
+            self.refresh_task_list()
+        for date_str in dates:
+            self.update_calendar_day(date_str)
+        self.update_selection_label()
 
     def update_calendar_colors(self):
-        """Actualiza los colores del calendario basado en las tareas"""
+        """Aplica los colores del tema y sincroniza el mes visible del calendario"""
         if not hasattr(self, 'calendar'):
             return
         
-        # Limpiar eventos anteriores
-        for tag in self.calendar.tag_names():
-            self.calendar.tag_delete(tag)
+        # Un tag por estado: cambiar de tema solo reconfigura estos cinco tags
+        for tag, color in self._calendar_tag_colors().items():
+            self.calendar.tag_config(tag, background=color)
+        self.sync_calendar_month()
+
+    def _calendar_tag_colors(self) -> Dict[str, str]:
+        return {
+            "cal_done": self.success_color,
+            "cal_partial_high": self.warning_color,
+            "cal_partial": "#ffd700",
+            "cal_pending_high": self.danger_color,
+            "cal_pending": "#ff7f50"
+        }
+
+    def _displayed_month(self) -> str:
+        month, year = self.calendar.get_displayed_month()
+        return f"{year:04d}-{month:02d}"
+
+    def sync_calendar_month(self, event=None):
+        """Actualiza solo los días del mes visible cuyo agregado cambió"""
+        month = self._displayed_month()
+        # Precargar el mes visible para que elegir un día sea inmediato
+        self.task_manager.ensure_month_loaded(month)
+        aggregates = self.task_manager.get_month_aggregates(month)
+        
+        # Días que ya no tienen tareas
+        for date_str in [d for d in self.calendar_days.get(month, {}) if d not in aggregates]:
+            self._sync_calendar_day(date_str, (0, 0, 0))
+        
+        for date_str, aggregate in aggregates.items():
+            self._sync_calendar_day(date_str, aggregate)
+
+    def update_calendar_day(self, date_str: str):
+        """Vuelve a pintar un único día si pertenece al mes visible"""
+        if not hasattr(self, 'calendar') or date_str[:7] != self._displayed_month():
+            return
+        self._sync_calendar_day(date_str, self.task_manager.get_day_aggregate(date_str))
 
-        tasks_by_date = self.task_manager.get_tasks_by_dates()
+    def _sync_calendar_day(self, date_str: str, aggregate):
+        """Crea, actualiza o elimina el evento de un día según su agregado"""
+        month_days = self.calendar_days.setdefault(date_str[:7], {})
+        shown = month_days.get(date_str)
+        if shown and shown[1] == aggregate:
+            return
+        
+        total_tasks, completed_tasks, high_priority_tasks = aggregate
+        if total_tasks == 0:
+            if shown:
+                self.calendar.calevent_remove(shown[0])
+                del month_days[date_str]
+            return
         
-        for date_str, tasks in tasks_by_date.items():
+        # Determinar el color basado en el estado de las tareas
+        if completed_tasks == total_tasks:
+            tag = "cal_done"
+        elif completed_tasks > 0:
+            tag = "cal_partial_high" if high_priority_tasks > 0 else "cal_partial"
+        else:
+            tag = "cal_pending_high" if high_priority_tasks > 0 else "cal_pending"
+        text = f"{completed_tasks}/{total_tasks} tareas completadas"
+        
+        if shown:
+            event_id = shown[0]
+            self.calendar.calevent_configure(event_id, text=text, tags=[tag])
+        else:
             try:
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                
-                completed_tasks = sum(1 for task in tasks if task.completed)
-                total_tasks = len(tasks)
-                high_priority_tasks = sum(1 for task in tasks if task.priority >= 4)
-                
-                if total_tasks > 0:
-                    # Determinar el color basado en el estado de las tareas
-                    if completed_tasks == total_tasks:
-                        color = self.success_color
-                    elif completed_tasks > 0:
-                        color = self.warning_color if high_priority_tasks > 0 else "#ffd700"
-                    else:
-                        color = self.danger_color if high_priority_tasks > 0 else "#ff7f50"
-                    
-                    # Crear evento en el calendario
-                    self.calendar.calevent_create(
-                        date=date_obj,
-                        text=f"{completed_tasks}/{total_tasks} tareas completadas",
-                        tags=[f"tag_{date_str}"]
-                    )
-                    self.calendar.tag_config(f"tag_{date_str}", background=color)
-                    
+                date_obj = date.fromisoformat(date_str)
             except ValueError as e:
                 print(f"Error al procesar fecha {date_str}: {e}")
+                return
+            event_id = self.calendar.calevent_create(date=date_obj, text=text, tags=[tag])
+        month_days[date_str] = (event_id, aggregate)
 
     def update_calendar_style(self):
+        import tkinter.ttk as ttk
         style = ttk.Style()
         
         if self.appearance_mode == "dark":
@@ -1145,7 +1241,6 @@ class UIManager:
         )
         
         if task:
-            self.refresh_task_list()
             if self.save_callback:
                 self.save_callback()  # Guardar después de editar
             dialog.destroy()
@@ -1322,6 +1417,7 @@ class UIManager:
             "¡hoy es el día perfecto para brillar!"
         ]
         
+        import random
         phrase = random.choice(motivational_phrases)
         welcome_text = f"{greeting}, {self.username} - {phrase}"
         
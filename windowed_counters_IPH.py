@@ -0,0 +1,57 @@
+from datetime import date
+from typing import Dict, Hashable, Iterable, Tuple
+
+def week_of(day: str) -> str:
+    """Lunes de la semana de un día ("YYYY-MM-DD")"""
+    ordinal = date.fromisoformat(day).toordinal()
+    return date.fromordinal(ordinal - (ordinal - 1) % 7).isoformat()
+
+class PeakCounter:
+    """Completadas por ventana (día, semana...) y el máximo de todas las ventanas.
+
+    Además del contador de cada ventana guarda cuántas ventanas tienen cada
+    valor. Como cada completada suma o resta 1 a una sola ventana, el máximo
+    sube o baja como mucho 1 y se mantiene en O(1), también al deshacer o al
+    completar con fecha pasada. Un lote que resta n baja el máximo como mucho n.
+    """
+
+    def __init__(self, counts: Iterable[Tuple[Hashable, int]] = ()):
+        self.rebuild(counts)
+
+    def rebuild(self, counts: Iterable[Tuple[Hashable, int]]) -> None:
+        self.counts: Dict[Hashable, int] = {}
+        for window, count in counts:
+            if count:
+                self.counts[window] = self.counts.get(window, 0) + count
+        self._windows_with: Dict[int, int] = {}  # valor -> nº de ventanas con ese valor
+        for count in self.counts.values():
+            self._windows_with[count] = self._windows_with.get(count, 0) + 1
+        self.peak = max(self._windows_with, default=0)
+
+    def _move(self, old: int, new: int) -> None:
+        if old:
+            self._windows_with[old] -= 1
+            if not self._windows_with[old]:
+                del self._windows_with[old]
+        if new:
+            self._windows_with[new] = self._windows_with.get(new, 0) + 1
+
+    def add(self, window: Hashable, delta: int = 1) -> None:
+        """Suma (delta > 0) o resta (delta < 0) completadas a la ventana"""
+        old = self.counts.get(window, 0)
+        new = old + delta
+        if new < 0 or not delta:
+            return
+        if new:
+            self.counts[window] = new
+        else:
+            del self.counts[window]
+        self._move(old, new)
+        if new > self.peak:
+            self.peak = new
+        else:
+            while self.peak and self.peak not in self._windows_with:
+                self.peak -= 1
+
+    def get(self, window: Hashable) -> int:
+        return self.counts.get(window, 0)